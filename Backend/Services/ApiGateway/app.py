@@ -1,43 +1,266 @@
-from flask import Flask, request, jsonify, Response
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, g, jsonify, Response, make_response, stream_with_context
 from flask_cors import CORS
+from werkzeug.datastructures import Headers
+from werkzeug.http import unquote_etag
+from werkzeug.test import EnvironBuilder
 import requests
+from config import Config
+from ratelimit import RateLimits, ConcurrencyLimiter, AdmissionRejected
+from auth import TokenVerifier, InvalidToken, is_public, requires_admin
+from upstream import build_session, SizedStream, ChunkedStream, run_health_checks
+from cache import ResponseCache, cache_key, content_etag
+from compression import Compressor, negotiate, is_compressible, encoded_etag
+from coalesce import SingleFlight
+from seatmap import merge_seatmap, merge_seatmap_bitmap, seat_id_window
+from batch import parse_batch, batch_item
+from resilience import CircuitOpenError, FAILURE_STATUSES
+from routes import (
+    AUTH_SERVICE, USER_SERVICE, MOVIE_SERVICE, RESERVATION_SERVICE, CATALOG_DEPENDENCIES,
+    build_pools, build_policies, upstream_headers, downstream_headers, is_volatile
+)
 
 app = Flask(__name__)
+app.config.from_object(Config)
 CORS(app)
 
-# Service URLs
-AUTH_SERVICE = 'http://localhost:5001'
-USER_SERVICE = 'http://localhost:5002'
-MOVIE_SERVICE = 'http://localhost:5003'
-RESERVATION_SERVICE = 'http://localhost:5004'
+# Replicas of each service and how requests are balanced across them
+UPSTREAMS = build_pools(app.config)
 
+# One pooled keep-alive session per upstream service
+SESSIONS = {
+    service: build_session(app.config['UPSTREAM_POOL_SIZE'], hosts=len(pool.replicas))
+    for service, pool in UPSTREAMS.items()
+}
 
-def forward_request(service_url, path):
+# Requests in flight per upstream service, with a short bounded wait queue
+ADMISSION = {
+    service: ConcurrencyLimiter(
+        app.config['UPSTREAM_MAX_CONCURRENCY'], app.config['UPSTREAM_QUEUE_SIZE'], app.config['UPSTREAM_QUEUE_TIMEOUT']
+    )
+    for service in UPSTREAMS
+}
+
+RATE_LIMITS = RateLimits(app.config)
+
+TOKENS = TokenVerifier(app.config['JWT_SECRET_KEY'], app.config['JWT_ALGORITHM'], app.config['JWT_CACHE_SIZE'])
+
+# Timeouts, circuit breaker and retry budget per upstream service
+POLICIES = build_policies(app.config)
+
+CATALOG_CACHE = ResponseCache(app.config['CATALOG_CACHE_SIZE'], app.config['CATALOG_CACHE_TTL'])
+COMPRESSOR = Compressor(app.config['GZIP_LEVEL'], app.config['BROTLI_QUALITY'], app.config['COMPRESSION_MEMO_SIZE'])
+
+# Identical concurrent catalog misses share a single upstream call
+CATALOG_FLIGHTS = SingleFlight()
+
+# Threads used to call several upstreams concurrently for aggregate endpoints
+FANOUT_EXECUTOR = ThreadPoolExecutor(max_workers=app.config['FANOUT_WORKERS'])
+# Batch sub-requests get their own pool since they may fan out again themselves
+BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=app.config['FANOUT_WORKERS'])
+
+if app.config['HEALTH_CHECK_INTERVAL'] > 0:
+    threading.Thread(
+        target=run_health_checks,
+        args=(
+            list(UPSTREAMS.values()),
+            app.config['HEALTH_CHECK_PATH'],
+            app.config['HEALTH_CHECK_INTERVAL'],
+            app.config['HEALTH_CHECK_TIMEOUT']
+        ),
+        daemon=True
+    ).start()
+
+
+@app.before_request
+def admit_request():
+    """Verify the caller, then apply rate limits and admin-only rules before any upstream work is done."""
+    g.claims = None
+    if request.method == 'OPTIONS' or request.url_rule is None or request.path == '/api/health':
+        return None
+
+    authorization = request.headers.get('Authorization')
+    token_error = None
+    if authorization:
+        try:
+            g.claims = TOKENS.verify(authorization)
+        except InvalidToken as e:
+            token_error = str(e)
+
+    subject = str(g.claims['sub']) if g.claims else None
+    retry_after = RATE_LIMITS.check(request.path, request.remote_addr, subject)
+    if retry_after:
+        return jsonify({'message': 'Too many requests'}), 429, {'Retry-After': str(retry_after)}
+
+    if is_public(request.method, request.path):
+        return None
+    if token_error:
+        return jsonify({'message': token_error}), 401
+    if g.claims is None:
+        return jsonify({'message': 'Missing Authorization Header'}), 401
+    if requires_admin(request.method, request.path) and g.claims.get('role') != 'ADMIN':
+        return jsonify({'message': 'Admin access required'}), 403
+    return None
+
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON bodies with the best encoding the client accepts."""
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None or not is_compressible(response, response.is_streamed, app.config['COMPRESSION_MIN_SIZE']):
+        return response
+    if response.is_streamed:
+        response.response = COMPRESSOR.compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(COMPRESSOR.compress(response.get_data(), encoding, response.headers.get('ETag')))
+    response.headers['Content-Encoding'] = encoding
+    if 'ETag' in response.headers:
+        response.headers['ETag'] = encoded_etag(response.headers['ETag'])
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def send_upstream(service, method, path, *args, **kwargs):
+    """Send one request to an upstream once it is admitted under the service's concurrency cap."""
+    limiter = ADMISSION[service]
+    if not limiter.acquire():
+        raise AdmissionRejected(1)
+    try:
+        return send_with_policy(service, method, path, *args, **kwargs)
+    finally:
+        limiter.release()
+
+
+def send_with_policy(service, method, path, replayable=True, timeout=None, **kwargs):
+    """Send one request to an upstream under its timeout (or the one given), circuit breaker and retry policy."""
+    policy = POLICIES[service]
+    pool = UPSTREAMS[service]
+    policy.retry_budget.deposit()
+    attempt = 0
+    while True:
+        if not policy.breaker.allow():
+            raise CircuitOpenError(policy.breaker.retry_after())
+        # Each attempt picks a replica afresh, so a retry usually lands on a different one.
+        # A replica counts as outstanding until its response headers arrive.
+        replica = pool.acquire()
+        try:
+            resp = SESSIONS[service].request(
+                method, f'{replica.url}{path}', timeout=timeout or policy.timeout, allow_redirects=False, **kwargs
+            )
+        except requests.exceptions.RequestException as e:
+            policy.breaker.record_failure()
+            if isinstance(e, requests.exceptions.ConnectionError):
+                pool.mark_down(replica)
+            if not policy.should_retry(method, attempt, replayable):
+                raise
+        except BaseException:
+            # Cancelled or interrupted (e.g. the client disconnected mid-upload): still settle the breaker,
+            # or a half-open trial would never report back
+            policy.breaker.record_failure()
+            raise
+        else:
+            if resp.status_code not in FAILURE_STATUSES:
+                policy.breaker.record_success()
+                return resp
+            policy.breaker.record_failure()
+            if not policy.should_retry(method, attempt, replayable):
+                return resp
+            resp.close()
+        finally:
+            pool.release(replica)
+        attempt += 1
+        time.sleep(policy.backoff_delay(attempt))
+
+
+def forward_request(service, path, conditional=True, timeout=None):
     """Forward incoming request to the target microservice."""
-    url = f"{service_url}{path}"
-    headers = {key: value for (key, value) in request.headers if key != 'Host'}
+    headers = upstream_headers(request.headers.items(), g.claims, conditional)
 
-    if 'Authorization' in headers:
-        print(f"DEBUG: Forwarding Authorization header: {headers['Authorization'][:20]}...")
+    chunk_size = app.config['PROXY_CHUNK_SIZE']
+    if request.content_length:
+        body = SizedStream(request.stream, request.content_length, chunk_size)
+    elif 'chunked' in request.headers.get('Transfer-Encoding', '').lower():
+        body = ChunkedStream(request.stream, chunk_size)
     else:
-        print("DEBUG: No Authorization header found in request to Gateway!")
+        body = request.get_data() or None
 
     try:
-        resp = requests.request(
-            method=request.method,
-            url=url,
+        resp = send_upstream(
+            service,
+            request.method,
+            path,
+            # A streamed body has been consumed by the first attempt and cannot be replayed
+            replayable=not isinstance(body, (SizedStream, ChunkedStream)),
+            timeout=timeout,
             headers=headers,
-            data=request.get_data(),
+            data=body,
             params=request.args,
-            cookies=request.cookies,
-            allow_redirects=False
+            stream=True
         )
-        excluded_headers = ['content-encoding', 'content-length', 'transfer-encoding', 'connection']
-        headers = {k: v for k, v in resp.headers.items() if k.lower() not in excluded_headers}
-        return Response(resp.content, resp.status_code, headers=headers)
+    except AdmissionRejected as e:
+        return jsonify({'message': 'Too many requests'}), 429, {'Retry-After': str(e.retry_after)}
+    except CircuitOpenError as e:
+        return jsonify({'message': 'Service unavailable: circuit open'}), 503, {'Retry-After': str(e.retry_after)}
     except requests.exceptions.RequestException as e:
         return jsonify({'message': f'Service unavailable: {str(e)}'}), 503
 
+    headers = downstream_headers(resp.headers.items())
+    proxied = Response(stream_with_context(resp.iter_content(chunk_size)), resp.status_code, headers=headers)
+    # Hand the connection back to the pool once the body has been sent
+    proxied.call_on_close(resp.close)
+    return proxied
+
+
+def fetch_catalog(key, path):
+    """Read a catalog GET into memory so it can be cached and shared with coalesced callers."""
+    generation = CATALOG_CACHE.generation
+    # Fetched unconditionally: the body is shared with waiters that may not hold the same ETag
+    resp = make_response(forward_request(MOVIE_SERVICE, path, conditional=False))
+    headers = Headers(resp.headers)
+    headers.remove('Content-Length')
+    body = resp.get_data()
+    if resp.status_code == 200 and 'ETag' not in headers:
+        headers['ETag'] = content_etag(body)
+    entry = (resp.status_code, headers, body)
+    resp.close()
+    if resp.status_code == 200:
+        CATALOG_CACHE.set(key, entry, generation)
+    return entry
+
+
+def catalog_response(entry, cache_status):
+    """Build the reply for a cached catalog entry, answering a matching If-None-Match with 304."""
+    status, headers, body = entry
+    etag = headers.get('ETag')
+    # Weak comparison, as clients may hold the weak tag of a compressed copy
+    if status == 200 and etag and request.if_none_match.contains_weak(unquote_etag(etag)[0]):
+        return Response(status=304, headers={'ETag': etag, 'X-Cache': cache_status})
+    response = Response(body, status, headers=headers)
+    response.headers['X-Cache'] = cache_status
+    return response
+
+
+def forward_catalog_request(resource, path):
+    """Serve public catalog GETs from the gateway cache and invalidate it on writes."""
+    if is_volatile(request.method, request.args):
+        # Answers that depend on live bookings must not be served from the cache
+        return forward_request(MOVIE_SERVICE, path)
+    if request.method == 'GET':
+        key = cache_key(path, request.args)
+        cached = CATALOG_CACHE.get(key)
+        if cached is not None:
+            return catalog_response(cached, 'HIT')
+
+        return catalog_response(CATALOG_FLIGHTS.do(key, lambda: fetch_catalog(key, path)), 'MISS')
+
+    resp = make_response(forward_request(MOVIE_SERVICE, path))
+    if resp.status_code < 400:
+        CATALOG_CACHE.invalidate(CATALOG_DEPENDENCIES[resource])
+    return resp
+
 
 # ==================== AUTH ROUTES ====================
 
@@ -56,28 +279,42 @@ def user_proxy(path):
 # ==================== MOVIE ROUTES ====================
 
 @app.route('/api/movies', defaults={'path': ''}, methods=['GET', 'POST'])
-@app.route('/api/movies/<path:path>', methods=['GET', 'PUT', 'DELETE'])
+@app.route('/api/movies/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE'])
 def movie_proxy(path):
     target_path = '/movies' if not path else f'/movies/{path}'
-    return forward_request(MOVIE_SERVICE, target_path)
+    return forward_catalog_request('/movies', target_path)
+
+@app.route('/api/movies/import', methods=['POST'])
+def movie_import_proxy():
+    # Feeds are streamed through and may take minutes to write, far beyond the usual read timeout
+    resp = make_response(forward_request(MOVIE_SERVICE, '/movies/import', timeout=app.config['MOVIE_IMPORT_TIMEOUT']))
+    if resp.status_code < 400:
+        CATALOG_CACHE.invalidate(CATALOG_DEPENDENCIES['/movies'])
+    return resp
 
 @app.route('/api/genres', defaults={'path': ''}, methods=['GET', 'POST'])
 @app.route('/api/genres/<path:path>', methods=['GET'])
 def genre_proxy(path):
     target_path = '/genres' if not path else f'/genres/{path}'
-    return forward_request(MOVIE_SERVICE, target_path)
+    return forward_catalog_request('/genres', target_path)
 
 @app.route('/api/theaters', defaults={'path': ''}, methods=['GET', 'POST'])
 @app.route('/api/theaters/<path:path>', methods=['GET', 'PUT', 'DELETE'])
 def theater_proxy(path):
     target_path = '/theaters' if not path else f'/theaters/{path}'
-    return forward_request(MOVIE_SERVICE, target_path)
+    return forward_catalog_request('/theaters', target_path)
 
 @app.route('/api/showtimes', defaults={'path': ''}, methods=['GET', 'POST'])
-@app.route('/api/showtimes/<path:path>', methods=['GET', 'DELETE'])
+@app.route('/api/showtimes/<path:path>', methods=['GET', 'POST', 'DELETE'])
 def showtime_proxy(path):
     target_path = '/showtimes' if not path else f'/showtimes/{path}'
-    return forward_request(MOVIE_SERVICE, target_path)
+    return forward_catalog_request('/showtimes', target_path)
+
+
+@app.route('/api/timetable', methods=['GET'])
+def timetable_proxy():
+    # Carries live seat counts, so it bypasses the catalog cache
+    return forward_request(MOVIE_SERVICE, '/timetable')
 
 
 # ==================== RESERVATION ROUTES ====================
@@ -89,11 +326,87 @@ def reservation_proxy(path):
     return forward_request(RESERVATION_SERVICE, target_path)
 
 
+# ==================== AGGREGATE ROUTES ====================
+
+def fetch_upstream(service, path):
+    return send_upstream(service, 'GET', path)
+
+@app.route('/api/showtimes/<int:showtime_id>/seatmap', methods=['GET'])
+def showtime_seatmap(showtime_id):
+    """Fetch a showtime's seat layout and booked seats and merge them.
+
+    The list form fetches both concurrently. With format=bitmap both are fetched in
+    their compact forms, the booked seats only for the theater's seat IDs, and merged
+    into a grid plus an occupied-seat bitset.
+    """
+    bitmap = request.args.get('format') == 'bitmap'
+    layout_path = f'/showtimes/{showtime_id}/seats'
+    booked_path = f'/reservations/showtime/{showtime_id}/booked-seats'
+    try:
+        if bitmap:
+            # Booked seats are asked for over exactly the theater's seat IDs, so the layout comes first
+            layout = fetch_upstream(MOVIE_SERVICE, f'{layout_path}?format=bitmap')
+            booked = None
+            if layout.status_code == 200:
+                base, size = seat_id_window(layout.json())
+                booked = fetch_upstream(RESERVATION_SERVICE, f'{booked_path}?format=bitmap&base={base}&size={size}')
+        else:
+            layout_future = FANOUT_EXECUTOR.submit(fetch_upstream, MOVIE_SERVICE, layout_path)
+            booked_future = FANOUT_EXECUTOR.submit(fetch_upstream, RESERVATION_SERVICE, booked_path)
+            layout, booked = layout_future.result(), booked_future.result()
+    except AdmissionRejected as e:
+        return jsonify({'message': 'Too many requests'}), 429, {'Retry-After': str(e.retry_after)}
+    except CircuitOpenError as e:
+        return jsonify({'message': 'Service unavailable: circuit open'}), 503, {'Retry-After': str(e.retry_after)}
+    except requests.exceptions.RequestException as e:
+        return jsonify({'message': f'Service unavailable: {str(e)}'}), 503
+
+    for resp in (layout, booked):
+        if resp is not None and resp.status_code != 200:
+            return Response(resp.content, resp.status_code, content_type=resp.headers.get('Content-Type'))
+    merge = merge_seatmap_bitmap if bitmap else merge_seatmap
+    return jsonify(merge(layout.json(), booked.json())), 200
+
+
+def dispatch_subrequest(item, headers, remote_addr):
+    """Run one batch entry through the normal routing, auth and proxy path of this gateway."""
+    builder = EnvironBuilder(
+        path=item['path'],
+        method=item['method'],
+        headers=headers,
+        json=item['body'],
+        environ_base={'REMOTE_ADDR': remote_addr}
+    )
+    with app.request_context(builder.get_environ()):
+        resp = app.full_dispatch_request()
+        try:
+            return batch_item(resp.status_code, resp.mimetype, resp.get_data())
+        finally:
+            resp.close()
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """Run several API calls concurrently and return all of their responses in one body."""
+    items, error = parse_batch(request.get_json(silent=True), app.config['BATCH_MAX_REQUESTS'])
+    if error:
+        return jsonify({'message': error}), 400
+
+    headers = {'Authorization': request.headers['Authorization']} if 'Authorization' in request.headers else {}
+    futures = [BATCH_EXECUTOR.submit(dispatch_subrequest, item, headers, request.remote_addr) for item in items]
+    return jsonify({'responses': [future.result() for future in futures]}), 200
+
+
 # ==================== HEALTH CHECK ====================
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'Gateway Operational'}), 200
+    circuits = {service: policy.breaker.state for service, policy in POLICIES.items()}
+    replicas = {service: pool.status() for service, pool in UPSTREAMS.items()}
+    return jsonify({'status': 'Gateway Operational', 'circuits': circuits, 'replicas': replicas}), 200
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({'catalog': CATALOG_CACHE.stats(), 'coalesced_requests': CATALOG_FLIGHTS.coalesced}), 200
 
 
 if __name__ == '__main__':
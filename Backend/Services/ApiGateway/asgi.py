@@ -0,0 +1,444 @@
+"""Asynchronous (ASGI) entry point for the API Gateway.
+
+Serves the same /api/... route table as app.py, but proxies every request over
+non-blocking httpx clients so thousands of slow upstream calls can share a single
+event loop. Run with: hypercorn asgi:app --bind 0.0.0.0:5000
+"""
+import asyncio
+from quart import Quart, request, g, jsonify, Response, make_response
+from quart_cors import cors
+from quart.wrappers.response import IterableBody
+import httpx
+from werkzeug.datastructures import Headers
+from werkzeug.http import unquote_etag
+from config import Config
+from cache import ResponseCache, cache_key, content_etag
+from compression import Compressor, negotiate, is_compressible, encoded_etag
+from coalesce import AsyncSingleFlight
+from seatmap import merge_seatmap, merge_seatmap_bitmap, seat_id_window
+from batch import parse_batch, batch_item
+from resilience import CircuitOpenError, FAILURE_STATUSES
+from ratelimit import RateLimits, AsyncConcurrencyLimiter, AdmissionRejected
+from auth import TokenVerifier, InvalidToken, is_public, requires_admin
+from routes import (
+    AUTH_SERVICE, USER_SERVICE, MOVIE_SERVICE, RESERVATION_SERVICE, CATALOG_DEPENDENCIES,
+    build_pools, build_policies, upstream_headers, downstream_headers, is_volatile
+)
+
+app = Quart(__name__)
+app.config.from_object(Config)
+app = cors(app)
+
+# Replicas of each service and how requests are balanced across them
+UPSTREAMS = build_pools(app.config)
+
+# One non-blocking client (and connection pool) per upstream service
+CLIENTS = {}
+
+# Requests in flight per upstream service, with a short bounded wait queue
+ADMISSION = {
+    service: AsyncConcurrencyLimiter(
+        app.config['ASYNC_UPSTREAM_MAX_CONCURRENCY'], app.config['UPSTREAM_QUEUE_SIZE'], app.config['UPSTREAM_QUEUE_TIMEOUT']
+    )
+    for service in UPSTREAMS
+}
+
+RATE_LIMITS = RateLimits(app.config)
+
+TOKENS = TokenVerifier(app.config['JWT_SECRET_KEY'], app.config['JWT_ALGORITHM'], app.config['JWT_CACHE_SIZE'])
+
+# Timeouts, circuit breaker and retry budget per upstream service
+POLICIES = build_policies(app.config)
+
+CATALOG_CACHE = ResponseCache(app.config['CATALOG_CACHE_SIZE'], app.config['CATALOG_CACHE_TTL'])
+COMPRESSOR = Compressor(app.config['GZIP_LEVEL'], app.config['BROTLI_QUALITY'], app.config['COMPRESSION_MEMO_SIZE'])
+
+# Identical concurrent catalog misses share a single upstream call
+CATALOG_FLIGHTS = AsyncSingleFlight()
+
+HEALTH_CHECK_TASKS = []
+
+
+async def run_health_checks():
+    """Probe every replica forever, taking unresponsive ones out of rotation until they recover."""
+    path = app.config['HEALTH_CHECK_PATH']
+    async with httpx.AsyncClient(timeout=app.config['HEALTH_CHECK_TIMEOUT'], trust_env=False) as client:
+        while True:
+            replicas = [replica for pool in UPSTREAMS.values() for replica in pool.replicas]
+            results = await asyncio.gather(
+                *(client.get(f'{replica.url}{path}') for replica in replicas), return_exceptions=True
+            )
+            for replica, result in zip(replicas, results):
+                replica.healthy = not isinstance(result, Exception) and result.status_code < 500
+            await asyncio.sleep(app.config['HEALTH_CHECK_INTERVAL'])
+
+
+@app.before_serving
+async def open_clients():
+    pool_size = app.config['ASYNC_UPSTREAM_POOL_SIZE']
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    for service, policy in POLICIES.items():
+        connect_timeout, read_timeout = policy.timeout
+        # Waiting for a free pooled connection is local back-pressure, not an upstream failure
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=None)
+        CLIENTS[service] = httpx.AsyncClient(limits=limits, timeout=timeout, trust_env=False)
+    if app.config['HEALTH_CHECK_INTERVAL'] > 0:
+        HEALTH_CHECK_TASKS.append(asyncio.create_task(run_health_checks()))
+
+
+@app.after_serving
+async def close_clients():
+    for task in HEALTH_CHECK_TASKS:
+        task.cancel()
+    HEALTH_CHECK_TASKS.clear()
+    for client in CLIENTS.values():
+        await client.aclose()
+    CLIENTS.clear()
+
+
+@app.before_request
+async def admit_request():
+    """Verify the caller, then apply rate limits and admin-only rules before any upstream work is done."""
+    g.claims = None
+    if request.method == 'OPTIONS' or request.url_rule is None or request.path == '/api/health':
+        return None
+
+    authorization = request.headers.get('Authorization')
+    token_error = None
+    if authorization:
+        try:
+            g.claims = TOKENS.verify(authorization)
+        except InvalidToken as e:
+            token_error = str(e)
+
+    subject = str(g.claims['sub']) if g.claims else None
+    retry_after = RATE_LIMITS.check(request.path, request.remote_addr, subject)
+    if retry_after:
+        return jsonify({'message': 'Too many requests'}), 429, {'Retry-After': str(retry_after)}
+
+    if is_public(request.method, request.path):
+        return None
+    if token_error:
+        return jsonify({'message': token_error}), 401
+    if g.claims is None:
+        return jsonify({'message': 'Missing Authorization Header'}), 401
+    if requires_admin(request.method, request.path) and g.claims.get('role') != 'ADMIN':
+        return jsonify({'message': 'Admin access required'}), 403
+    return None
+
+
+async def _body_chunks(body):
+    async with body as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+
+@app.after_request
+async def compress_response(response):
+    """Compress large JSON bodies with the best encoding the client accepts."""
+    encoding = negotiate(request.accept_encodings)
+    streamed = isinstance(response.response, IterableBody)
+    if encoding is None or not is_compressible(response, streamed, app.config['COMPRESSION_MIN_SIZE']):
+        return response
+    if streamed:
+        response.response = IterableBody(COMPRESSOR.compress_async_stream(_body_chunks(response.response), encoding))
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(COMPRESSOR.compress(await response.get_data(), encoding, response.headers.get('ETag')))
+    response.headers['Content-Encoding'] = encoding
+    if 'ETag' in response.headers:
+        response.headers['ETag'] = encoded_etag(response.headers['ETag'])
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+async def send_upstream(service, method, path, *args, **kwargs):
+    """Send one request to an upstream once it is admitted under the service's concurrency cap."""
+    limiter = ADMISSION[service]
+    if not await limiter.acquire():
+        raise AdmissionRejected(1)
+    try:
+        return await send_with_policy(service, method, path, *args, **kwargs)
+    finally:
+        await limiter.release()
+
+
+async def send_with_policy(service, method, path, replayable=True, stream=False, timeout=None, **kwargs):
+    """Send one request to an upstream under its timeout (or the one given), circuit breaker and retry policy."""
+    policy = POLICIES[service]
+    pool = UPSTREAMS[service]
+    client = CLIENTS[service]
+    if timeout is not None:
+        connect_timeout, read_timeout = timeout
+        kwargs['timeout'] = httpx.Timeout(read_timeout, connect=connect_timeout, pool=None)
+    policy.retry_budget.deposit()
+    attempt = 0
+    while True:
+        if not policy.breaker.allow():
+            raise CircuitOpenError(policy.breaker.retry_after())
+        # Each attempt picks a replica afresh, so a retry usually lands on a different one.
+        # A replica counts as outstanding until its response headers arrive.
+        replica = pool.acquire()
+        try:
+            upstream_request = client.build_request(method, f'{replica.url}{path}', **kwargs)
+            resp = await client.send(upstream_request, stream=stream, follow_redirects=False)
+        except httpx.HTTPError as e:
+            policy.breaker.record_failure()
+            if isinstance(e, httpx.ConnectError):
+                pool.mark_down(replica)
+            if not policy.should_retry(method, attempt, replayable):
+                raise
+        except BaseException:
+            # Cancelled or interrupted (e.g. the client disconnected mid-upload): still settle the breaker,
+            # or a half-open trial would never report back
+            policy.breaker.record_failure()
+            raise
+        else:
+            if resp.status_code not in FAILURE_STATUSES:
+                policy.breaker.record_success()
+                return resp
+            policy.breaker.record_failure()
+            if not policy.should_retry(method, attempt, replayable):
+                return resp
+            await resp.aclose()
+        finally:
+            pool.release(replica)
+        attempt += 1
+        await asyncio.sleep(policy.backoff_delay(attempt))
+
+
+async def forward_request(service, path, conditional=True, timeout=None):
+    """Forward incoming request to the target microservice without blocking the event loop."""
+    headers = upstream_headers(request.headers.items(), g.claims, conditional)
+
+    streamed = bool(request.content_length) or 'chunked' in request.headers.get('Transfer-Encoding', '').lower()
+    if streamed:
+        body = request.body
+    else:
+        body = await request.get_data() or None
+
+    try:
+        resp = await send_upstream(
+            service,
+            request.method,
+            path,
+            # A streamed body has been consumed by the first attempt and cannot be replayed
+            replayable=not streamed,
+            stream=True,
+            timeout=timeout,
+            headers=headers,
+            content=body,
+            params=list(request.args.items(multi=True))
+        )
+    except AdmissionRejected as e:
+        return jsonify({'message': 'Too many requests'}), 429, {'Retry-After': str(e.retry_after)}
+    except CircuitOpenError as e:
+        return jsonify({'message': 'Service unavailable: circuit open'}), 503, {'Retry-After': str(e.retry_after)}
+    except httpx.HTTPError as e:
+        return jsonify({'message': f'Service unavailable: {str(e)}'}), 503
+
+    async def stream_body():
+        try:
+            async for chunk in resp.aiter_bytes(app.config['PROXY_CHUNK_SIZE']):
+                yield chunk
+        finally:
+            await resp.aclose()
+
+    headers = downstream_headers(resp.headers.items())
+    return Response(stream_body(), resp.status_code, headers=headers)
+
+
+async def fetch_catalog(key, path):
+    """Read a catalog GET into memory so it can be cached and shared with coalesced callers."""
+    generation = CATALOG_CACHE.generation
+    # Fetched unconditionally: the body is shared with waiters that may not hold the same ETag
+    resp = await make_response(await forward_request(MOVIE_SERVICE, path, conditional=False))
+    headers = Headers(resp.headers)
+    headers.remove('Content-Length')
+    body = await resp.get_data()
+    if resp.status_code == 200 and 'ETag' not in headers:
+        headers['ETag'] = content_etag(body)
+    entry = (resp.status_code, headers, body)
+    if resp.status_code == 200:
+        CATALOG_CACHE.set(key, entry, generation)
+    return entry
+
+
+def catalog_response(entry, cache_status):
+    """Build the reply for a cached catalog entry, answering a matching If-None-Match with 304."""
+    status, headers, body = entry
+    etag = headers.get('ETag')
+    # Weak comparison, as clients may hold the weak tag of a compressed copy
+    if status == 200 and etag and request.if_none_match.contains_weak(unquote_etag(etag)[0]):
+        return Response(status=304, headers={'ETag': etag, 'X-Cache': cache_status})
+    response = Response(body, status, headers=headers)
+    response.headers['X-Cache'] = cache_status
+    return response
+
+
+async def forward_catalog_request(resource, path):
+    """Serve public catalog GETs from the gateway cache and invalidate it on writes."""
+    if is_volatile(request.method, request.args):
+        # Answers that depend on live bookings must not be served from the cache
+        return await forward_request(MOVIE_SERVICE, path)
+    if request.method == 'GET':
+        key = cache_key(path, request.args)
+        cached = CATALOG_CACHE.get(key)
+        if cached is not None:
+            return catalog_response(cached, 'HIT')
+
+        return catalog_response(await CATALOG_FLIGHTS.do(key, lambda: fetch_catalog(key, path)), 'MISS')
+
+    resp = await make_response(await forward_request(MOVIE_SERVICE, path))
+    if resp.status_code < 400:
+        CATALOG_CACHE.invalidate(CATALOG_DEPENDENCIES[resource])
+    return resp
+
+
+# ==================== AUTH ROUTES ====================
+
+@app.route('/api/auth/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE'])
+async def auth_proxy(path):
+    return await forward_request(AUTH_SERVICE, f'/auth/{path}')
+
+
+# ==================== USER ROUTES ====================
+
+@app.route('/api/users/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE'])
+async def user_proxy(path):
+    return await forward_request(USER_SERVICE, f'/users/{path}')
+
+
+# ==================== MOVIE ROUTES ====================
+
+@app.route('/api/movies', defaults={'path': ''}, methods=['GET', 'POST'])
+@app.route('/api/movies/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE'])
+async def movie_proxy(path):
+    target_path = '/movies' if not path else f'/movies/{path}'
+    return await forward_catalog_request('/movies', target_path)
+
+@app.route('/api/movies/import', methods=['POST'])
+async def movie_import_proxy():
+    # Feeds are streamed through and may take minutes to write, far beyond the usual read timeout
+    resp = await make_response(await forward_request(
+        MOVIE_SERVICE, '/movies/import', timeout=app.config['MOVIE_IMPORT_TIMEOUT']
+    ))
+    if resp.status_code < 400:
+        CATALOG_CACHE.invalidate(CATALOG_DEPENDENCIES['/movies'])
+    return resp
+
+@app.route('/api/genres', defaults={'path': ''}, methods=['GET', 'POST'])
+@app.route('/api/genres/<path:path>', methods=['GET'])
+async def genre_proxy(path):
+    target_path = '/genres' if not path else f'/genres/{path}'
+    return await forward_catalog_request('/genres', target_path)
+
+@app.route('/api/theaters', defaults={'path': ''}, methods=['GET', 'POST'])
+@app.route('/api/theaters/<path:path>', methods=['GET', 'PUT', 'DELETE'])
+async def theater_proxy(path):
+    target_path = '/theaters' if not path else f'/theaters/{path}'
+    return await forward_catalog_request('/theaters', target_path)
+
+@app.route('/api/showtimes', defaults={'path': ''}, methods=['GET', 'POST'])
+@app.route('/api/showtimes/<path:path>', methods=['GET', 'POST', 'DELETE'])
+async def showtime_proxy(path):
+    target_path = '/showtimes' if not path else f'/showtimes/{path}'
+    return await forward_catalog_request('/showtimes', target_path)
+
+
+@app.route('/api/timetable', methods=['GET'])
+async def timetable_proxy():
+    # Carries live seat counts, so it bypasses the catalog cache
+    return await forward_request(MOVIE_SERVICE, '/timetable')
+
+
+# ==================== RESERVATION ROUTES ====================
+
+@app.route('/api/reservations', defaults={'path': ''}, methods=['GET', 'POST'])
+@app.route('/api/reservations/<path:path>', methods=['GET', 'POST', 'DELETE'])
+async def reservation_proxy(path):
+    target_path = '/reservations' if not path else f'/reservations/{path}'
+    return await forward_request(RESERVATION_SERVICE, target_path)
+
+
+# ==================== AGGREGATE ROUTES ====================
+
+@app.route('/api/showtimes/<int:showtime_id>/seatmap', methods=['GET'])
+async def showtime_seatmap(showtime_id):
+    """Fetch a showtime's seat layout and booked seats and merge them.
+
+    The list form fetches both concurrently. With format=bitmap both are fetched in
+    their compact forms, the booked seats only for the theater's seat IDs, and merged
+    into a grid plus an occupied-seat bitset.
+    """
+    bitmap = request.args.get('format') == 'bitmap'
+    layout_path = f'/showtimes/{showtime_id}/seats'
+    booked_path = f'/reservations/showtime/{showtime_id}/booked-seats'
+    try:
+        if bitmap:
+            # Booked seats are asked for over exactly the theater's seat IDs, so the layout comes first
+            layout = await send_upstream(MOVIE_SERVICE, 'GET', f'{layout_path}?format=bitmap')
+            booked = None
+            if layout.status_code == 200:
+                base, size = seat_id_window(layout.json())
+                booked = await send_upstream(
+                    RESERVATION_SERVICE, 'GET', f'{booked_path}?format=bitmap&base={base}&size={size}'
+                )
+        else:
+            layout, booked = await asyncio.gather(
+                send_upstream(MOVIE_SERVICE, 'GET', layout_path),
+                send_upstream(RESERVATION_SERVICE, 'GET', booked_path)
+            )
+    except AdmissionRejected as e:
+        return jsonify({'message': 'Too many requests'}), 429, {'Retry-After': str(e.retry_after)}
+    except CircuitOpenError as e:
+        return jsonify({'message': 'Service unavailable: circuit open'}), 503, {'Retry-After': str(e.retry_after)}
+    except httpx.HTTPError as e:
+        return jsonify({'message': f'Service unavailable: {str(e)}'}), 503
+
+    for resp in (layout, booked):
+        if resp is not None and resp.status_code != 200:
+            return Response(resp.content, resp.status_code, content_type=resp.headers.get('Content-Type'))
+    merge = merge_seatmap_bitmap if bitmap else merge_seatmap
+    return jsonify(merge(layout.json(), booked.json())), 200
+
+
+async def dispatch_subrequest(item, headers, remote_addr):
+    """Run one batch entry through the normal routing, auth and proxy path of this gateway."""
+    body = {'json': item['body']} if item['body'] is not None else {}
+    context = app.test_request_context(
+        item['path'], method=item['method'], headers=headers, scope_base={'client': (remote_addr, 0)}, **body
+    )
+    async with context:
+        resp = await app.full_dispatch_request(context)
+        return batch_item(resp.status_code, resp.mimetype, await resp.get_data())
+
+@app.route('/api/batch', methods=['POST'])
+async def batch():
+    """Run several API calls concurrently and return all of their responses in one body."""
+    items, error = parse_batch(await request.get_json(silent=True), app.config['BATCH_MAX_REQUESTS'])
+    if error:
+        return jsonify({'message': error}), 400
+
+    headers = {'Authorization': request.headers['Authorization']} if 'Authorization' in request.headers else {}
+    responses = await asyncio.gather(
+        *(dispatch_subrequest(item, headers, request.remote_addr) for item in items)
+    )
+    return jsonify({'responses': list(responses)}), 200
+
+
+# ==================== HEALTH CHECK ====================
+
+@app.route('/api/health', methods=['GET'])
+async def health():
+    circuits = {service: policy.breaker.state for service, policy in POLICIES.items()}
+    replicas = {service: pool.status() for service, pool in UPSTREAMS.items()}
+    return jsonify({'status': 'Gateway Operational', 'circuits': circuits, 'replicas': replicas}), 200
+
+@app.route('/api/cache/stats', methods=['GET'])
+async def cache_stats():
+    return jsonify({'catalog': CATALOG_CACHE.stats(), 'coalesced_requests': CATALOG_FLIGHTS.coalesced}), 200
+
+
+if __name__ == '__main__':
+    app.run(port=5000, debug=True)
@@ -0,0 +1,92 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+
+ANY_METHOD = ('GET', 'POST', 'PUT', 'DELETE')
+
+# Routes callable without a token; an invalid token on these is left for the service to judge
+PUBLIC_ROUTES = [
+    (ANY_METHOD, re.compile(r'^/api/auth/')),
+    (('GET',), re.compile(r'^/api/(movies|genres|theaters|showtimes)(/.*)?$')),
+    (('GET',), re.compile(r'^/api/timetable$')),
+    (('GET',), re.compile(r'^/api/reservations/(showtime/\d+/booked-seats|booked-counts)$')),
+    (('GET',), re.compile(r'^/api/(health|cache/stats)$')),
+    # Each sub-request of a batch is checked on its own as it is dispatched
+    (('POST',), re.compile(r'^/api/batch$'))
+]
+
+# Routes only admins may call
+ADMIN_ROUTES = [
+    (('GET',), re.compile(r'^/api/reservations/(all|stats)$')),
+    (('POST', 'PUT', 'DELETE'), re.compile(r'^/api/(movies|genres|theaters|showtimes)(/.*)?$'))
+]
+
+# Identity headers the gateway sets for upstream services; never accepted from clients
+TRUSTED_HEADERS = ('x-user-id', 'x-user-role')
+
+
+class InvalidToken(Exception):
+    """Raised when a bearer token is malformed, badly signed or expired."""
+
+
+def _matches(routes, method, path):
+    return any(method in methods and pattern.match(path) for methods, pattern in routes)
+
+
+def is_public(method, path):
+    return _matches(PUBLIC_ROUTES, method, path)
+
+
+def requires_admin(method, path):
+    return _matches(ADMIN_ROUTES, method, path)
+
+
+def identity_headers(claims):
+    """Trusted headers telling upstream services who the verified caller is."""
+    if not claims:
+        return {}
+    return {'X-User-Id': str(claims['sub']), 'X-User-Role': str(claims.get('role', ''))}
+
+
+class TokenVerifier:
+    """Verify bearer tokens once and remember the claims of good ones until they expire."""
+
+    def __init__(self, secret, algorithm, cache_size):
+        self.secret = secret
+        self.algorithm = algorithm
+        self.cache_size = cache_size
+        self._verified = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, authorization):
+        """Return the claims of a valid 'Bearer <token>' header, or raise InvalidToken."""
+        if not authorization.startswith('Bearer '):
+            raise InvalidToken("Missing 'Bearer' type in 'Authorization' header")
+        token = authorization[7:].strip()
+        now = time.time()
+
+        with self._lock:
+            cached = self._verified.get(token)
+            if cached is not None:
+                if cached.get('exp', now + 1) > now:
+                    self._verified.move_to_end(token)
+                    return cached
+                del self._verified[token]
+
+        try:
+            claims = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        except jwt.ExpiredSignatureError:
+            raise InvalidToken('Token has expired')
+        except jwt.InvalidTokenError:
+            raise InvalidToken('Invalid token')
+        if 'sub' not in claims or claims.get('type', 'access') != 'access':
+            raise InvalidToken('Invalid token')
+
+        with self._lock:
+            self._verified[token] = claims
+            if len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return claims
@@ -0,0 +1,35 @@
+import json
+
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+
+def parse_batch(payload, max_requests):
+    """Validate a batch body; return (sub_requests, None) or (None, error message)."""
+    items = payload.get('requests') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, 'A non-empty "requests" list is required'
+    if len(items) > max_requests:
+        return None, f'At most {max_requests} requests may be batched'
+
+    sub_requests = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return None, f'Request {index} needs a "path"'
+        method = str(item.get('method', 'GET')).upper()
+        path = item['path']
+        if method not in BATCH_METHODS:
+            return None, f'Request {index} uses unsupported method {method}'
+        if not path.startswith('/api/') or path.split('?')[0].rstrip('/') == '/api/batch':
+            return None, f'Request {index} must target an /api/ route other than /api/batch'
+        sub_requests.append({'method': method, 'path': path, 'body': item.get('body')})
+    return sub_requests, None
+
+
+def batch_item(status, mimetype, body):
+    """One entry of the batch reply: the sub-request's status code and decoded body."""
+    if mimetype == 'application/json' and body:
+        try:
+            return {'status': status, 'body': json.loads(body)}
+        except ValueError:
+            pass
+    return {'status': status, 'body': body.decode('utf-8', errors='replace')}
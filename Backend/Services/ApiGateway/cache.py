@@ -0,0 +1,74 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+
+def cache_key(path, args):
+    """Build a cache key from the upstream path and a normalised query string."""
+    query = urlencode(sorted(args.items(multi=True)))
+    return f'{path}?{query}' if query else path
+
+
+def content_etag(body):
+    """Strong ETag from a hash of the response body, for upstreams that do not send one."""
+    return '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+class ResponseCache:
+    """Bounded TTL + LRU cache of upstream responses keyed on path and query string."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Bumped by every invalidation so a fetch that raced a write is not cached
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefixes):
+        """Drop every key whose path is one of prefixes or lies beneath it."""
+        with self._lock:
+            self.generation += 1
+            stale = [
+                key for key in self._entries
+                if any(key == p or key.startswith((p + '/', p + '?')) for p in prefixes)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl
+            }
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one, sharing its result with every waiter."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # Later callers start a fresh flight, so nobody is handed an already-finished result
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Event-loop counterpart of SingleFlight for the ASGI gateway."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+
+    async def do(self, key, fn):
+        task = self._calls.get(key)
+        if task is None:
+            # Run the call as its own task so one waiter disconnecting does not cancel it for the rest
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
@@ -0,0 +1,89 @@
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first when the client rates several encodings equally
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain')
+
+
+def negotiate(accept_encodings):
+    """Pick the best encoding both the client and the gateway support, or None."""
+    return accept_encodings.best_match(ENCODINGS)
+
+
+def encoded_etag(etag):
+    """The ETag of an encoded body: weak, since its bytes differ from the representation the upstream tagged."""
+    return etag if etag.startswith('W/') else 'W/' + etag
+
+
+def is_compressible(response, streamed, min_size):
+    if response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    # Streamed bodies have no known length up front and are usually the large ones
+    return streamed or (response.content_length or 0) >= min_size
+
+
+class Compressor:
+    """gzip/brotli encoding with a small LRU of already-compressed bodies keyed by strong ETag."""
+
+    def __init__(self, gzip_level, brotli_quality, memo_size):
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compress(self, data, encoding, etag=None):
+        key = (etag, encoding)
+        if etag:
+            with self._lock:
+                cached = self._memo.get(key)
+                if cached is not None:
+                    self._memo.move_to_end(key)
+                    return cached
+
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(data, compresslevel=self.gzip_level)
+
+        if etag:
+            with self._lock:
+                self._memo[key] = compressed
+                if len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return compressed
+
+    def _stream_encoder(self, encoding):
+        if encoding == 'br':
+            encoder = brotli.Compressor(quality=self.brotli_quality)
+            return encoder.process, encoder.finish
+        # wbits=31 makes zlib write a gzip header and trailer
+        encoder = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return encoder.compress, encoder.flush
+
+    def compress_stream(self, chunks, encoding):
+        process, finish = self._stream_encoder(encoding)
+        for chunk in chunks:
+            out = process(chunk)
+            if out:
+                yield out
+        yield finish()
+
+    async def compress_async_stream(self, chunks, encoding):
+        process, finish = self._stream_encoder(encoding)
+        async for chunk in chunks:
+            out = process(chunk)
+            if out:
+                yield out
+        yield finish()
@@ -0,0 +1,86 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class Config:
+    # Upstream replicas: comma-separated URLs per service (the *_URL form still works for one replica)
+    AUTH_SERVICE_URLS = os.getenv('AUTH_SERVICE_URLS', os.getenv('AUTH_SERVICE_URL', 'http://localhost:5001')).split(',')
+    USER_SERVICE_URLS = os.getenv('USER_SERVICE_URLS', os.getenv('USER_SERVICE_URL', 'http://localhost:5002')).split(',')
+    MOVIE_SERVICE_URLS = os.getenv('MOVIE_SERVICE_URLS', os.getenv('MOVIE_SERVICE_URL', 'http://localhost:5003')).split(',')
+    RESERVATION_SERVICE_URLS = os.getenv(
+        'RESERVATION_SERVICE_URLS', os.getenv('RESERVATION_SERVICE_URL', 'http://localhost:5004')
+    ).split(',')
+
+    # Load balancing across replicas: 'round_robin' or 'least_outstanding'
+    UPSTREAM_BALANCER = os.getenv('UPSTREAM_BALANCER', 'least_outstanding')
+
+    # Active health checks; any answer below 500 on HEALTH_CHECK_PATH counts as healthy (0 disables)
+    HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', '5'))
+    HEALTH_CHECK_PATH = os.getenv('HEALTH_CHECK_PATH', '/')
+    HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', '1'))
+    # Seconds a replica that refused a connection stays out of rotation, with or without health checks
+    UPSTREAM_FAILURE_COOLDOWN = float(os.getenv('UPSTREAM_FAILURE_COOLDOWN', '5'))
+
+    # Keep-alive connections held open per upstream service
+    UPSTREAM_POOL_SIZE = int(os.getenv('UPSTREAM_POOL_SIZE', '50'))
+    # The ASGI gateway multiplexes many more in-flight requests per process
+    ASYNC_UPSTREAM_POOL_SIZE = int(os.getenv('ASYNC_UPSTREAM_POOL_SIZE', '1000'))
+    # Chunk size used when streaming request/response bodies through the gateway
+    PROXY_CHUNK_SIZE = int(os.getenv('PROXY_CHUNK_SIZE', str(64 * 1024)))
+
+    # Gateway cache for public catalog GETs (movies, genres, theaters, showtimes)
+    CATALOG_CACHE_SIZE = int(os.getenv('CATALOG_CACHE_SIZE', '1024'))
+    CATALOG_CACHE_TTL = float(os.getenv('CATALOG_CACHE_TTL', '30'))
+
+    # Worker threads the sync gateway uses to call several upstreams in parallel
+    FANOUT_WORKERS = int(os.getenv('FANOUT_WORKERS', '32'))
+
+    # Per-service (connect, read) timeouts in seconds
+    AUTH_SERVICE_TIMEOUT = (float(os.getenv('AUTH_CONNECT_TIMEOUT', '2')), float(os.getenv('AUTH_READ_TIMEOUT', '5')))
+    USER_SERVICE_TIMEOUT = (float(os.getenv('USER_CONNECT_TIMEOUT', '2')), float(os.getenv('USER_READ_TIMEOUT', '5')))
+    MOVIE_SERVICE_TIMEOUT = (float(os.getenv('MOVIE_CONNECT_TIMEOUT', '2')), float(os.getenv('MOVIE_READ_TIMEOUT', '10')))
+    # Catalog imports stream large feeds and answer only once they are written
+    MOVIE_IMPORT_TIMEOUT = (float(os.getenv('MOVIE_CONNECT_TIMEOUT', '2')), float(os.getenv('MOVIE_IMPORT_READ_TIMEOUT', '900')))
+    RESERVATION_SERVICE_TIMEOUT = (
+        float(os.getenv('RESERVATION_CONNECT_TIMEOUT', '2')), float(os.getenv('RESERVATION_READ_TIMEOUT', '10'))
+    )
+
+    # Circuit breaker: consecutive failures before failing fast, and seconds before probing again
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+    BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', '30'))
+
+    # Retries for idempotent requests, bounded per request and by a per-service budget
+    RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '2'))
+    RETRY_BUDGET_RATIO = float(os.getenv('RETRY_BUDGET_RATIO', '0.2'))
+    RETRY_BUDGET_MAX = int(os.getenv('RETRY_BUDGET_MAX', '10'))
+    RETRY_BACKOFF = float(os.getenv('RETRY_BACKOFF', '0.05'))
+
+    # Token-bucket rate limits (requests/second and burst) applied before anything is proxied
+    RATE_LIMIT_IP_RATE = float(os.getenv('RATE_LIMIT_IP_RATE', '50'))
+    RATE_LIMIT_IP_BURST = float(os.getenv('RATE_LIMIT_IP_BURST', '100'))
+    RATE_LIMIT_USER_RATE = float(os.getenv('RATE_LIMIT_USER_RATE', '20'))
+    RATE_LIMIT_USER_BURST = float(os.getenv('RATE_LIMIT_USER_BURST', '40'))
+    RATE_LIMIT_LOGIN_RATE = float(os.getenv('RATE_LIMIT_LOGIN_RATE', '1'))
+    RATE_LIMIT_LOGIN_BURST = float(os.getenv('RATE_LIMIT_LOGIN_BURST', '5'))
+    RATE_LIMIT_MAX_CLIENTS = int(os.getenv('RATE_LIMIT_MAX_CLIENTS', '100000'))
+
+    # In-flight requests allowed per upstream service, and how many more may queue (and for how long)
+    UPSTREAM_MAX_CONCURRENCY = int(os.getenv('UPSTREAM_MAX_CONCURRENCY', '100'))
+    ASYNC_UPSTREAM_MAX_CONCURRENCY = int(os.getenv('ASYNC_UPSTREAM_MAX_CONCURRENCY', '1000'))
+    UPSTREAM_QUEUE_SIZE = int(os.getenv('UPSTREAM_QUEUE_SIZE', '50'))
+    UPSTREAM_QUEUE_TIMEOUT = float(os.getenv('UPSTREAM_QUEUE_TIMEOUT', '0.5'))
+
+    # Gateway-side verification of the access tokens issued by AuthService
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev_jwt_secret_key')
+    JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+    JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', '10000'))
+
+    # Maximum sub-requests accepted by one POST /api/batch
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '20'))
+
+    # Response compression (brotli is used when the optional brotli package is installed)
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+    GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '6'))
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '5'))
+    COMPRESSION_MEMO_SIZE = int(os.getenv('COMPRESSION_MEMO_SIZE', '256'))
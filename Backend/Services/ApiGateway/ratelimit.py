@@ -0,0 +1,129 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is turned away before reaching an upstream."""
+
+    def __init__(self, retry_after):
+        super().__init__('too many requests')
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token buckets keyed by client; only the max_keys most recently seen clients are tracked."""
+
+    def __init__(self, rate, burst, max_keys):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key):
+        """Take one token for key; return 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = max(1, math.ceil((1 - tokens) / self.rate))
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class ConcurrencyLimiter:
+    """Cap in-flight requests to one upstream; a short queue may wait briefly for a free slot."""
+
+    def __init__(self, limit, queue_size, max_wait):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue_size:
+                return False
+            self.waiting += 1
+            try:
+                admitted = self._condition.wait_for(lambda: self.active < self.limit, timeout=self.max_wait)
+                if admitted:
+                    self.active += 1
+                return admitted
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+class AsyncConcurrencyLimiter:
+    """Event-loop counterpart of ConcurrencyLimiter for the ASGI gateway."""
+
+    def __init__(self, limit, queue_size, max_wait):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        if self.active < self.limit:
+            self.active += 1
+            return True
+        if self.waiting >= self.queue_size:
+            return False
+        self.waiting += 1
+        try:
+            async with self._condition:
+                await asyncio.wait_for(self._condition.wait_for(lambda: self.active < self.limit), self.max_wait)
+                self.active += 1
+                return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    async def release(self):
+        self.active -= 1
+        async with self._condition:
+            self._condition.notify()
+
+
+class RateLimits:
+    """Per-IP and per-subject buckets for all API traffic, plus a tighter per-IP bucket for login."""
+
+    def __init__(self, config):
+        max_keys = config['RATE_LIMIT_MAX_CLIENTS']
+        self.per_ip = RateLimiter(config['RATE_LIMIT_IP_RATE'], config['RATE_LIMIT_IP_BURST'], max_keys)
+        self.per_user = RateLimiter(config['RATE_LIMIT_USER_RATE'], config['RATE_LIMIT_USER_BURST'], max_keys)
+        self.login = RateLimiter(config['RATE_LIMIT_LOGIN_RATE'], config['RATE_LIMIT_LOGIN_BURST'], max_keys)
+
+    def check(self, path, ip, subject):
+        """Return 0 if the request is admitted, else the Retry-After in seconds."""
+        if path == '/api/auth/login':
+            wait = self.login.consume(ip)
+            if wait:
+                return wait
+        if subject is not None:
+            wait = self.per_user.consume(subject)
+            if wait:
+                return wait
+        return self.per_ip.consume(ip)
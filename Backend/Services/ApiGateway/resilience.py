@@ -0,0 +1,111 @@
+import threading
+import time
+
+# Only these methods are safe to replay against an upstream
+RETRYABLE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Upstream answers that mean "unhealthy", not "bad request"
+FAILURE_STATUSES = (502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+    def __init__(self, retry_after):
+        super().__init__('circuit open')
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fail fast while an upstream keeps failing, then let a single trial request probe it."""
+
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            # A trial that never reported back (e.g. it was cancelled) is replaced after another reset_timeout
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def retry_after(self):
+        remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+        return max(1, int(remaining + 0.5))
+
+
+class RetryBudget:
+    """Cap retries to a fraction of request volume so retries cannot amplify an outage."""
+
+    def __init__(self, ratio, max_tokens):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = float(max_tokens)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class UpstreamPolicy:
+    """Timeouts, circuit breaker and retry budget for one upstream service."""
+
+    def __init__(self, timeout, breaker, retry_budget, max_retries, backoff):
+        self.timeout = timeout
+        self.breaker = breaker
+        self.retry_budget = retry_budget
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    @classmethod
+    def from_config(cls, config, timeout):
+        return cls(
+            timeout=timeout,
+            breaker=CircuitBreaker(config['BREAKER_FAILURE_THRESHOLD'], config['BREAKER_RESET_TIMEOUT']),
+            retry_budget=RetryBudget(config['RETRY_BUDGET_RATIO'], config['RETRY_BUDGET_MAX']),
+            max_retries=config['RETRY_MAX_ATTEMPTS'],
+            backoff=config['RETRY_BACKOFF']
+        )
+
+    def should_retry(self, method, attempt, replayable=True):
+        return (
+            replayable
+            and method in RETRYABLE_METHODS
+            and attempt < self.max_retries
+            and self.retry_budget.withdraw()
+        )
+
+    def backoff_delay(self, attempt):
+        return self.backoff * (2 ** (attempt - 1))
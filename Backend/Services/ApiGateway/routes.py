@@ -0,0 +1,74 @@
+"""Upstream services, catalog cache rules and header filtering shared by app.py and asgi.py.
+
+Both gateway entry points serve the same route table; anything that decides
+where or how a request is proxied lives here so the two cannot drift apart.
+"""
+from auth import TRUSTED_HEADERS, identity_headers
+from resilience import UpstreamPolicy
+from upstream import ServicePool
+
+# Upstream services
+AUTH_SERVICE = 'auth'
+USER_SERVICE = 'user'
+MOVIE_SERVICE = 'movie'
+RESERVATION_SERVICE = 'reservation'
+
+# Config keys holding each service's replica URLs and (connect, read) timeout
+SERVICE_CONFIG = {
+    AUTH_SERVICE: ('AUTH_SERVICE_URLS', 'AUTH_SERVICE_TIMEOUT'),
+    USER_SERVICE: ('USER_SERVICE_URLS', 'USER_SERVICE_TIMEOUT'),
+    MOVIE_SERVICE: ('MOVIE_SERVICE_URLS', 'MOVIE_SERVICE_TIMEOUT'),
+    RESERVATION_SERVICE: ('RESERVATION_SERVICE_URLS', 'RESERVATION_SERVICE_TIMEOUT')
+}
+
+# Query arguments whose answers depend on data outside the catalog (see `volatile` in MovieService)
+VOLATILE_CATALOG_ARGS = ('min_available',)
+
+# Writes to one catalog resource also stale every cached resource that embeds it
+CATALOG_DEPENDENCIES = {
+    '/genres': ('/genres', '/movies'),
+    # Catalog imports under /movies also create genres
+    '/movies': ('/movies', '/showtimes', '/genres'),
+    '/theaters': ('/theaters', '/showtimes', '/movies'),
+    '/showtimes': ('/showtimes', '/movies')
+}
+
+# The client's body framing; the upstream request is framed afresh for the body actually sent
+BODY_FRAMING_HEADERS = ('content-length', 'transfer-encoding')
+CONDITIONAL_HEADERS = ('if-none-match', 'if-modified-since')
+# Upstream response headers the gateway re-frames (and may re-encode) itself
+EXCLUDED_RESPONSE_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection')
+
+
+def build_pools(config):
+    """Replicas of each service and how requests are balanced across them."""
+    return {
+        service: ServicePool(config[urls_key], config['UPSTREAM_BALANCER'], config['UPSTREAM_FAILURE_COOLDOWN'])
+        for service, (urls_key, _) in SERVICE_CONFIG.items()
+    }
+
+
+def build_policies(config):
+    """Timeouts, circuit breaker and retry budget per upstream service."""
+    return {
+        service: UpstreamPolicy.from_config(config, config[timeout_key])
+        for service, (_, timeout_key) in SERVICE_CONFIG.items()
+    }
+
+
+def upstream_headers(headers, claims, conditional=True):
+    """Client request headers to send upstream, with the verified identity in place of any the client sent."""
+    dropped = ('host',) + TRUSTED_HEADERS + BODY_FRAMING_HEADERS + (() if conditional else CONDITIONAL_HEADERS)
+    forwarded = {key: value for key, value in headers if key.lower() not in dropped}
+    forwarded.update(identity_headers(claims))
+    return forwarded
+
+
+def downstream_headers(headers):
+    """Upstream response headers to pass back to the client."""
+    return {key: value for key, value in headers if key.lower() not in EXCLUDED_RESPONSE_HEADERS}
+
+
+def is_volatile(method, args):
+    """Whether a catalog request must bypass the cache because it depends on live bookings."""
+    return method == 'GET' and any(arg in args for arg in VOLATILE_CATALOG_ARGS)
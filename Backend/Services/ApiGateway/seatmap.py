@@ -0,0 +1,92 @@
+import base64
+
+
+def encode_bitset(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for p in positions:
+        bits[p // 8] |= 0x80 >> (p % 8)
+    return base64.b64encode(bytes(bits)).decode()
+
+
+def decode_bitset(encoded, size):
+    """Set positions of a base64 bitset whose position 0 is the high bit of the first byte."""
+    bits = base64.b64decode(encoded) if encoded else b''
+    return [p for p in range(min(size, len(bits) * 8)) if bits[p // 8] & (0x80 >> (p % 8))]
+
+
+def merge_seatmap(layout, booked):
+    """Annotate a showtime's seat layout with the booked seats reported by ReservationService."""
+    booked_ids = set(booked.get('booked_seat_ids', []))
+    rows = {}
+    for seat in layout.get('seats', []):
+        rows.setdefault(seat['row_label'], []).append({
+            'seat_id': seat['seat_id'],
+            'seat_number': seat['seat_number'],
+            'available': seat['seat_id'] not in booked_ids
+        })
+
+    total = sum(len(seats) for seats in rows.values())
+    available = sum(seat['available'] for seats in rows.values() for seat in seats)
+    return {
+        'showtime_id': layout.get('showtime_id'),
+        'theater_name': layout.get('theater_name'),
+        'total_seats': total,
+        'available_seats': available,
+        'rows': [
+            {'row_label': row_label, 'seats': sorted(seats, key=lambda s: s['seat_number'])}
+            for row_label, seats in rows.items()
+        ]
+    }
+
+
+def seat_id_window(layout):
+    """(base, size) of the seat IDs a compact layout covers, to request booked seats for exactly those."""
+    if 'first_seat_id' in layout:
+        size = len(layout['rows']) * layout['seats_per_row']
+        return layout['first_seat_id'], size - len(decode_bitset(layout['gaps'], size))
+    seat_ids = layout['seat_ids']
+    if not seat_ids:
+        return 0, 0
+    return min(seat_ids), max(seat_ids) - min(seat_ids) + 1
+
+
+def merge_seatmap_bitmap(layout, booked):
+    """Compact seat map: the theater's row-major grid with a bitset of occupied positions.
+
+    layout is MovieService's compact layout and booked ReservationService's booked-seat
+    bitset; seat k of the layout (in position order, skipping gaps) has ID
+    first_seat_id + k, or seat_ids[k] for theaters without consecutive IDs.
+    """
+    labels, seats_per_row = layout['rows'], layout['seats_per_row']
+    size = len(labels) * seats_per_row
+    gaps = set(decode_bitset(layout['gaps'], size))
+    positions = [p for p in range(size) if p not in gaps]
+
+    if 'first_seat_id' in layout:
+        first_seat_id = layout['first_seat_id']
+        seat_index = lambda seat_id: seat_id - first_seat_id
+    else:
+        indexes = {seat_id: k for k, seat_id in enumerate(layout['seat_ids'])}
+        seat_index = lambda seat_id: indexes.get(seat_id, -1)
+
+    occupied = []
+    for offset in decode_bitset(booked['booked'], booked['size']):
+        k = seat_index(booked['base'] + offset)
+        if 0 <= k < len(positions):
+            occupied.append(positions[k])
+
+    seatmap = {
+        'showtime_id': layout.get('showtime_id'),
+        'theater_name': layout.get('theater_name'),
+        'total_seats': len(positions),
+        'available_seats': len(positions) - len(occupied),
+        'rows': labels,
+        'seats_per_row': seats_per_row,
+        'gaps': layout['gaps'],
+        'occupied': encode_bitset(occupied, size)
+    }
+    if 'first_seat_id' in layout:
+        seatmap['first_seat_id'] = layout['first_seat_id']
+    else:
+        seatmap['seat_ids'] = layout['seat_ids']
+    return seatmap
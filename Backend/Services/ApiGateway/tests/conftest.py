@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+import time
+
+import jwt
+import pytest
+import requests
+
+# The gateway is a flat set of modules run from its own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['HEALTH_CHECK_INTERVAL'] = '0'
+os.environ['RETRY_BACKOFF'] = '0'
+
+import app as gateway  # noqa: E402
+from cache import ResponseCache  # noqa: E402
+from coalesce import SingleFlight  # noqa: E402
+from ratelimit import RateLimits, ConcurrencyLimiter  # noqa: E402
+from routes import build_pools, build_policies  # noqa: E402
+
+
+def upstream_response(status=200, body=None, headers=None):
+    """A requests.Response as an upstream would send it, with a JSON body."""
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = json.dumps(body if body is not None else {}).encode()
+    resp._content_consumed = True
+    resp.headers.update({'Content-Type': 'application/json', **(headers or {})})
+    return resp
+
+
+class FakeUpstreams:
+    """Stands in for every upstream service; handlers answer by service, method and path."""
+
+    def __init__(self):
+        self.calls = []
+        self.handlers = {}
+
+    def on(self, service, handler):
+        """handler(method, path, kwargs) returns a requests.Response or raises."""
+        self.handlers[service] = handler
+
+    def paths(self, service=None):
+        return [path for s, method, path in self.calls if service in (None, s)]
+
+    def session_request(self, service):
+        def request(method, url, **kwargs):
+            path = '/' + url.split('/', 3)[3]
+            self.calls.append((service, method, path))
+            handler = self.handlers.get(service, lambda *args: upstream_response(body={'path': path}))
+            return handler(method, path, kwargs)
+        return request
+
+
+@pytest.fixture
+def upstreams(monkeypatch):
+    """Fresh gateway state with every upstream call answered by a FakeUpstreams."""
+    config = gateway.app.config
+    monkeypatch.setattr(gateway, 'UPSTREAMS', build_pools(config))
+    monkeypatch.setattr(gateway, 'POLICIES', build_policies(config))
+    monkeypatch.setattr(gateway, 'RATE_LIMITS', RateLimits(config))
+    monkeypatch.setattr(gateway, 'ADMISSION', {
+        service: ConcurrencyLimiter(
+            config['UPSTREAM_MAX_CONCURRENCY'], config['UPSTREAM_QUEUE_SIZE'], config['UPSTREAM_QUEUE_TIMEOUT']
+        )
+        for service in gateway.UPSTREAMS
+    })
+    monkeypatch.setattr(gateway, 'CATALOG_CACHE', ResponseCache(config['CATALOG_CACHE_SIZE'], config['CATALOG_CACHE_TTL']))
+    monkeypatch.setattr(gateway, 'CATALOG_FLIGHTS', SingleFlight())
+
+    fake = FakeUpstreams()
+    for service, session in gateway.SESSIONS.items():
+        monkeypatch.setattr(session, 'request', fake.session_request(service))
+    return fake
+
+
+@pytest.fixture
+def client(upstreams):
+    return gateway.app.test_client()
+
+
+def bearer(role='USER', sub='7'):
+    config = gateway.app.config
+    token = jwt.encode({'sub': sub, 'role': role, 'exp': int(time.time()) + 600},
+                       config['JWT_SECRET_KEY'], algorithm=config['JWT_ALGORITHM'])
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def user_headers():
+    return bearer()
+
+
+@pytest.fixture
+def admin_headers():
+    return bearer('ADMIN', sub='1')
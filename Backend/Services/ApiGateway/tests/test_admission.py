@@ -0,0 +1,97 @@
+import time
+
+import pytest
+import requests
+
+import app as gateway
+from ratelimit import ConcurrencyLimiter, RateLimits
+from resilience import CircuitBreaker
+from routes import MOVIE_SERVICE, RESERVATION_SERVICE
+from conftest import upstream_response
+
+
+@pytest.fixture
+def tight_limits(monkeypatch):
+    config = dict(gateway.app.config, RATE_LIMIT_IP_RATE=0.001, RATE_LIMIT_IP_BURST=2)
+    monkeypatch.setattr(gateway, 'RATE_LIMITS', RateLimits(config))
+
+
+def test_rate_limit_rejects_with_retry_after(client, upstreams, tight_limits):
+    assert [client.get('/api/genres').status_code for _ in range(3)] == [200, 200, 429]
+    assert int(client.get('/api/genres').headers['Retry-After']) >= 1
+    assert len(upstreams.calls) == 1
+
+
+def test_full_upstream_is_rejected_before_it_is_called(client, upstreams, monkeypatch):
+    monkeypatch.setitem(gateway.ADMISSION, MOVIE_SERVICE, ConcurrencyLimiter(0, 0, 0))
+    resp = client.get('/api/movies')
+    assert resp.status_code == 429 and 'Retry-After' in resp.headers
+    assert upstreams.calls == []
+
+
+@pytest.fixture
+def breaker(upstreams):
+    breaker = gateway.POLICIES[RESERVATION_SERVICE].breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    gateway.POLICIES[RESERVATION_SERVICE].max_retries = 0
+    return breaker
+
+
+def booked_seats(client):
+    return client.get('/api/reservations/showtime/1/booked-seats')
+
+
+def test_breaker_opens_after_consecutive_failures(client, upstreams, breaker):
+    upstreams.on(RESERVATION_SERVICE, lambda *args: upstream_response(503))
+    assert [booked_seats(client).status_code for _ in range(2)] == [503, 503]
+    assert breaker.state == CircuitBreaker.OPEN
+
+    resp = booked_seats(client)
+    assert resp.status_code == 503 and resp.get_json()['message'] == 'Service unavailable: circuit open'
+    assert 'Retry-After' in resp.headers
+    assert len(upstreams.calls) == 2
+
+
+@pytest.mark.parametrize('status, state', [(200, CircuitBreaker.CLOSED), (503, CircuitBreaker.OPEN)])
+def test_half_open_trial_settles_breaker(client, upstreams, breaker, status, state):
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+    upstreams.on(RESERVATION_SERVICE, lambda *args: upstream_response(status))
+
+    assert booked_seats(client).status_code == status
+    assert breaker.state == state
+    assert len(upstreams.calls) == 1
+
+
+def test_interrupted_trial_reopens_breaker(client, upstreams, breaker):
+    breaker.state, breaker.opened_at = CircuitBreaker.OPEN, time.monotonic() - breaker.reset_timeout
+
+    def interrupted(*args):
+        raise KeyboardInterrupt()
+    upstreams.on(RESERVATION_SERVICE, interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        booked_seats(client)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_idempotent_requests_are_retried_within_budget(client, upstreams):
+    answers = iter([upstream_response(502), upstream_response(200)])
+    upstreams.on(MOVIE_SERVICE, lambda *args: next(answers))
+    assert client.get('/api/showtimes/4/seats').status_code == 200
+    assert len(upstreams.calls) == 2
+
+
+def test_retries_stop_when_budget_is_spent(client, upstreams):
+    gateway.POLICIES[MOVIE_SERVICE].retry_budget.tokens = 0
+    upstreams.on(MOVIE_SERVICE, lambda *args: upstream_response(502))
+    assert client.get('/api/showtimes/4/seats').status_code == 502
+    assert len(upstreams.calls) == 1
+
+
+def test_writes_are_not_retried(client, upstreams, user_headers):
+    def refused(*args):
+        raise requests.exceptions.ConnectionError('refused')
+    upstreams.on(RESERVATION_SERVICE, refused)
+    resp = client.post('/api/reservations', json={'showtime_id': 1, 'seat_ids': [1]}, headers=user_headers)
+    assert resp.status_code == 503
+    assert len(upstreams.calls) == 1
@@ -0,0 +1,51 @@
+import app as gateway
+from routes import MOVIE_SERVICE, RESERVATION_SERVICE
+from conftest import upstream_response
+
+
+def run_batch(client, requests, headers=None):
+    resp = client.post('/api/batch', json={'requests': requests}, headers=headers or {})
+    assert resp.status_code == 200
+    return [(item['status'], item['body']) for item in resp.get_json()['responses']]
+
+
+def test_sub_requests_are_authorized_one_by_one(client, upstreams, user_headers):
+    responses = run_batch(client, [
+        {'path': '/api/movies/3'},
+        {'path': '/api/reservations'},
+        {'path': '/api/reservations/all'},
+        {'method': 'DELETE', 'path': '/api/movies/3'}
+    ], user_headers)
+    assert [status for status, _ in responses] == [200, 200, 403, 403]
+    assert responses[2][1] == {'message': 'Admin access required'}
+    assert sorted(upstreams.calls) == [(MOVIE_SERVICE, 'GET', '/movies/3'), (RESERVATION_SERVICE, 'GET', '/reservations')]
+
+
+def test_admin_sub_requests_pass(client, upstreams, admin_headers):
+    assert run_batch(client, [{'path': '/api/reservations/all'}], admin_headers)[0][0] == 200
+
+
+def test_anonymous_batch_reaches_only_public_routes(client, upstreams):
+    responses = run_batch(client, [{'path': '/api/genres'}, {'path': '/api/reservations'}])
+    assert [status for status, _ in responses] == [200, 401]
+    assert upstreams.paths() == ['/genres']
+
+
+def test_sub_requests_carry_the_verified_identity(client, upstreams, user_headers):
+    sent = []
+
+    def record(method, path, kwargs):
+        sent.append(kwargs['headers'])
+        return upstream_response(201)
+    upstreams.on(RESERVATION_SERVICE, record)
+    responses = run_batch(client, [{'method': 'POST', 'path': '/api/reservations', 'body': {'showtime_id': 1}}],
+                          {**user_headers, 'X-User-Id': '1'})
+    assert responses[0][0] == 201
+    assert sent[0]['X-User-Id'] == '7' and sent[0]['X-User-Role'] == 'USER'
+
+
+def test_invalid_batches_are_rejected(client, upstreams):
+    for body in ({}, {'requests': []}, {'requests': [{'path': '/api/batch', 'method': 'POST'}]},
+                 {'requests': [{'path': '/api/movies'}] * (gateway.app.config['BATCH_MAX_REQUESTS'] + 1)}):
+        assert client.post('/api/batch', json=body).status_code == 400
+    assert upstreams.calls == []
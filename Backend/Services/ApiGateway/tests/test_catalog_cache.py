@@ -0,0 +1,63 @@
+import threading
+import time
+
+import app as gateway
+from routes import MOVIE_SERVICE
+from conftest import upstream_response
+
+
+def test_repeated_get_is_served_from_cache(client, upstreams):
+    first = client.get('/api/movies?limit=5')
+    second = client.get('/api/movies?limit=5')
+    assert (first.headers['X-Cache'], second.headers['X-Cache']) == ('MISS', 'HIT')
+    assert second.get_json() == first.get_json()
+    assert upstreams.paths(MOVIE_SERVICE) == ['/movies']
+
+
+def test_matching_etag_gets_304_from_cache(client, upstreams):
+    upstreams.on(MOVIE_SERVICE, lambda *args: upstream_response(body={'id': 1}, headers={'ETag': '"v1"'}))
+    client.get('/api/movies/1')
+    resp = client.get('/api/movies/1', headers={'If-None-Match': '"v1"'})
+    assert resp.status_code == 304
+    assert resp.headers['ETag'] == '"v1"' and resp.headers['X-Cache'] == 'HIT'
+    assert len(upstreams.calls) == 1
+
+
+def test_write_invalidates_dependent_resources(client, upstreams, admin_headers):
+    client.get('/api/movies')
+    client.get('/api/genres')
+    assert client.post('/api/genres', json={'name': 'Noir'}, headers=admin_headers).status_code == 200
+    assert client.get('/api/movies').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/genres').headers['X-Cache'] == 'MISS'
+
+
+def test_volatile_arguments_bypass_cache(client, upstreams):
+    client.get('/api/showtimes?min_available=2')
+    resp = client.get('/api/showtimes?min_available=2')
+    assert 'X-Cache' not in resp.headers
+    assert len(upstreams.calls) == 2
+
+
+def test_concurrent_misses_share_one_upstream_call(client, upstreams):
+    callers = 5
+
+    def slow(method, path, kwargs):
+        # Hold the leader until everyone else has joined its flight
+        deadline = time.monotonic() + 2
+        while gateway.CATALOG_FLIGHTS.coalesced < callers - 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return upstream_response(body={'path': path})
+    upstreams.on(MOVIE_SERVICE, slow)
+
+    statuses = []
+    threads = [
+        threading.Thread(target=lambda: statuses.append(gateway.app.test_client().get('/api/theaters').status_code))
+        for _ in range(callers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * callers
+    assert upstreams.paths(MOVIE_SERVICE) == ['/theaters']
+    assert gateway.CATALOG_FLIGHTS.coalesced == callers - 1
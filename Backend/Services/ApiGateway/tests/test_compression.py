@@ -0,0 +1,24 @@
+import gzip
+
+from routes import MOVIE_SERVICE
+from conftest import upstream_response
+
+MOVIES = [{'movie_id': i, 'title': f'Movie {i}'} for i in range(200)]
+
+
+def test_compressed_body_gets_weak_etag(client, upstreams):
+    upstreams.on(MOVIE_SERVICE, lambda *args: upstream_response(body=MOVIES, headers={'ETag': '"v1"'}))
+    plain = client.get('/api/movies')
+    compressed = client.get('/api/movies', headers={'Accept-Encoding': 'gzip'})
+
+    assert plain.headers['ETag'] == '"v1"' and 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'] == 'W/"v1"'
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+
+
+def test_weak_etag_of_compressed_copy_revalidates(client, upstreams):
+    upstreams.on(MOVIE_SERVICE, lambda *args: upstream_response(body=MOVIES, headers={'ETag': '"v1"'}))
+    client.get('/api/movies', headers={'Accept-Encoding': 'gzip'})
+    resp = client.get('/api/movies', headers={'Accept-Encoding': 'gzip', 'If-None-Match': 'W/"v1"'})
+    assert resp.status_code == 304
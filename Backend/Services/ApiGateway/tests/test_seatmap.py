@@ -0,0 +1,39 @@
+from routes import MOVIE_SERVICE, RESERVATION_SERVICE
+from seatmap import decode_bitset, seat_id_window
+from conftest import upstream_response
+
+# Two rows of three seats with no seat at B3: IDs 10-14
+LAYOUT = {'showtime_id': 1, 'theater_name': 'T', 'rows': ['A', 'B'], 'seats_per_row': 3, 'gaps': 'BA==',
+          'first_seat_id': 10}
+
+
+def test_seat_id_window():
+    assert seat_id_window(LAYOUT) == (10, 5)
+    assert seat_id_window({'rows': ['A'], 'seats_per_row': 3, 'gaps': '', 'seat_ids': [4, 9]}) == (4, 6)
+
+
+def test_bitmap_seatmap_asks_for_theater_seats_only(client, upstreams):
+    upstreams.on(MOVIE_SERVICE, lambda *args: upstream_response(body=LAYOUT))
+
+    def booked(method, path, kwargs):
+        # ReservationService rejects a defaulted window once a stray seat such as 2147483647 is booked
+        if 'base=10&size=5' not in path:
+            return upstream_response(400, {'message': 'size must be between 0 and 100000'})
+        return upstream_response(body={'base': 10, 'size': 5, 'booked': 'iA=='})  # seats 10 and 14
+    upstreams.on(RESERVATION_SERVICE, booked)
+
+    resp = client.get('/api/showtimes/1/seatmap?format=bitmap')
+    assert resp.status_code == 200
+    seatmap = resp.get_json()
+    assert (seatmap['total_seats'], seatmap['available_seats']) == (5, 3)
+    assert decode_bitset(seatmap['occupied'], 6) == [0, 4]
+    assert upstreams.paths() == [
+        '/showtimes/1/seats?format=bitmap',
+        '/reservations/showtime/1/booked-seats?format=bitmap&base=10&size=5'
+    ]
+
+
+def test_bitmap_seatmap_of_unknown_showtime(client, upstreams):
+    upstreams.on(MOVIE_SERVICE, lambda *args: upstream_response(404, {'message': 'Not found'}))
+    assert client.get('/api/showtimes/1/seatmap?format=bitmap').status_code == 404
+    assert upstreams.paths(RESERVATION_SERVICE) == []
@@ -0,0 +1,50 @@
+import pytest
+
+from upstream import ServicePool
+
+
+@pytest.fixture
+def pool():
+    return ServicePool(['http://a', 'http://b'], ServicePool.ROUND_ROBIN, failure_cooldown=5)
+
+
+def pick(pool, times):
+    urls = []
+    for _ in range(times):
+        replica = pool.acquire()
+        pool.release(replica)
+        urls.append(replica.url)
+    return urls
+
+
+def test_round_robin(pool):
+    assert pick(pool, 4) == ['http://a', 'http://b', 'http://a', 'http://b']
+
+
+def test_failed_replica_returns_after_cooldown(pool, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('upstream.time.monotonic', lambda: clock[0])
+    pool.mark_down(pool.replicas[0])
+    assert set(pick(pool, 4)) == {'http://b'}
+    assert [r['healthy'] for r in pool.status()] == [False, True]
+
+    clock[0] += 5
+    assert set(pick(pool, 4)) == {'http://a', 'http://b'}
+    assert [r['healthy'] for r in pool.status()] == [True, True]
+
+
+def test_replica_failing_health_checks_stays_out(pool):
+    pool.replicas[0].healthy = False
+    assert set(pick(pool, 4)) == {'http://b'}
+
+
+def test_all_replicas_down_still_serves(pool):
+    for replica in pool.replicas:
+        pool.mark_down(replica)
+    assert set(pick(pool, 4)) == {'http://a', 'http://b'}
+
+
+def test_least_outstanding_prefers_idle_replica():
+    pool = ServicePool(['http://a', 'http://b'], ServicePool.LEAST_OUTSTANDING, failure_cooldown=5)
+    busy = pool.acquire()
+    assert pool.acquire() is not busy
@@ -0,0 +1,131 @@
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def build_session(pool_size, hosts=1):
+    """Create a keep-alive session with a connection pool per replica host of one upstream service."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # Sessions are shared by every client, so never let upstream cookies stick to them
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    session.trust_env = False
+    return session
+
+
+class SizedStream:
+    """Iterate over a request body in chunks while still advertising its Content-Length."""
+
+    def __init__(self, stream, length, chunk_size):
+        self.stream = stream
+        self.length = length
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        remaining = self.length
+        while remaining > 0:
+            chunk = self.stream.read(min(self.chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class ChunkedStream:
+    """Iterate over a request body of unknown length (Transfer-Encoding: chunked) as it arrives."""
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        while True:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+class Replica:
+    """One instance of an upstream service."""
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        # Set by the health checks; down_until by failed requests, which bench a replica only for a while
+        self.healthy = True
+        self.down_until = 0.0
+        self.outstanding = 0
+
+    def available(self, now):
+        return self.healthy and now >= self.down_until
+
+
+class ServicePool:
+    """Replicas of one upstream service and the strategy used to balance requests across them."""
+
+    ROUND_ROBIN = 'round_robin'
+    LEAST_OUTSTANDING = 'least_outstanding'
+
+    def __init__(self, urls, strategy, failure_cooldown):
+        if strategy not in (self.ROUND_ROBIN, self.LEAST_OUTSTANDING):
+            raise ValueError(f'Unknown load balancing strategy: {strategy}')
+        self.replicas = [Replica(url) for url in urls]
+        self.strategy = strategy
+        self.failure_cooldown = failure_cooldown
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Pick a replica for one request and count it as outstanding until released."""
+        with self._lock:
+            # With every replica marked down, keep trying all of them rather than refusing traffic
+            now = time.monotonic()
+            candidates = [r for r in self.replicas if r.available(now)] or self.replicas
+            start = self._next % len(candidates)
+            self._next += 1
+            if self.strategy == self.LEAST_OUTSTANDING:
+                rotated = candidates[start:] + candidates[:start]
+                replica = min(rotated, key=lambda r: r.outstanding)
+            else:
+                replica = candidates[start]
+            replica.outstanding += 1
+            return replica
+
+    def release(self, replica):
+        with self._lock:
+            replica.outstanding -= 1
+
+    def mark_down(self, replica):
+        """Take a replica that refused a connection out of rotation for failure_cooldown seconds."""
+        with self._lock:
+            replica.down_until = time.monotonic() + self.failure_cooldown
+
+    def status(self):
+        now = time.monotonic()
+        return [
+            {'url': r.url, 'healthy': r.available(now), 'outstanding': r.outstanding}
+            for r in self.replicas
+        ]
+
+
+def run_health_checks(pools, path, interval, timeout):
+    """Probe every replica forever, taking unresponsive ones out of rotation until they recover."""
+    session = build_session(pool_size=1)
+    while True:
+        for pool in pools:
+            for replica in pool.replicas:
+                try:
+                    resp = session.get(f'{replica.url}{path}', timeout=timeout, allow_redirects=False)
+                    resp.close()
+                    replica.healthy = resp.status_code < 500
+                except requests.exceptions.RequestException:
+                    replica.healthy = False
+        time.sleep(interval)
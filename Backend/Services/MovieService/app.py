@@ -1,9 +1,57 @@
+import threading
+import time
+import click
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt
+from datetime import date, datetime
+from sqlalchemy import select, insert, delete
+from sqlalchemy.orm import joinedload, selectinload, load_only, lazyload
 from config import Config
-from models import db, Movie, Genre, Theater, Seat, Showtime
+from models import db, Movie, Genre, Theater, Seat, Showtime, movie_genres
+from versioning import init_versioning, conditional, current_versions, bump_versions
+from pagination import InvalidQuery, paginate, page_limit, parse_datetime, parse_int, local_datetime
+from availability import AvailabilityUnavailable, booked_counts, remaining_seats, with_min_available
+from projection import Projection
+from search import SearchIndex, movie_document
+from layout import build_layout, insert_seats, layout_from_seats
+from scheduling import parse_recurrence, slot_length, lock_theater, theater_index
+from catalog_import import FORMATS, CatalogImporter, read_records
+from response_cache import ResponseCache
+from timetable import refresh_timetable, day_timetable
+from retention import delete_expired_showtimes
+
+# What catalog reads may return; requested relationships are loaded up front in a fixed number of queries
+MOVIE_PROJECTION = Projection(
+    [Movie.movie_id],
+    {
+        'title': Movie.title, 'description': Movie.description,
+        'poster_url': Movie.poster_url, 'runtime_minutes': Movie.runtime_minutes
+    },
+    {
+        'genres': (Movie.genres, selectinload(Movie.genres)),
+        'showtimes': (Movie.showtimes, selectinload(Movie.showtimes).joinedload(Showtime.theater).load_only(Theater.name))
+    }
+)
+
+SHOWTIME_PROJECTION = Projection(
+    [Showtime.showtime_id, Showtime.start_time],
+    {
+        'movie_id': Showtime.movie_id, 'theater_id': Showtime.theater_id,
+        'start_time': Showtime.start_time, 'price': Showtime.price
+    },
+    {
+        'movie': (Showtime.movie, joinedload(Showtime.movie).options(load_only(Movie.title), lazyload(Movie.genres))),
+        'theater': (Showtime.theater, joinedload(Showtime.theater).load_only(Theater.name, Theater.total_seats))
+    }
+)
+
+THEATER_PROJECTION = Projection(
+    [Theater.theater_id],
+    {'name': Theater.name, 'total_seats': Theater.total_seats, 'layout': Theater.layout},
+    {'seats': (Theater.seats, selectinload(Theater.seats))}
+)
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -12,11 +60,86 @@ CORS(app)
 db.init_app(app)
 migrate = Migrate(app, db)
 jwt = JWTManager(app)
+init_versioning(db)
+
+SEARCH_INDEX = SearchIndex(app.config['SEARCH_MAX_PREFIX_TERMS'])
+SEARCH_BUILD_LOCK = threading.Lock()
+
+# Serialized genre, theater and seat-layout responses; they change far less often than they are read
+CATALOG_CACHE = ResponseCache(app.config['CATALOG_CACHE_MAX_ENTRIES'], app.config['CATALOG_CACHE_MAX_BYTES'])
+
+
+@app.errorhandler(InvalidQuery)
+def invalid_query(e):
+    return jsonify({'message': str(e)}), 400
+
+@app.errorhandler(AvailabilityUnavailable)
+def availability_unavailable(e):
+    return jsonify({'message': 'Seat availability is temporarily unavailable'}), 503
+
+
+def movies_with_genre(genre_id):
+    return select(movie_genres.c.movie_id).where(movie_genres.c.genre_id == genre_id)
+
+
+def search_index():
+    """The movie search index, built on first use and rebuilt when another replica has changed the catalog."""
+    interval = app.config['SEARCH_REFRESH_INTERVAL']
+    if SEARCH_INDEX.loaded and (interval <= 0 or time.monotonic() - SEARCH_INDEX.checked_at < interval):
+        return SEARCH_INDEX
+    with SEARCH_BUILD_LOCK:
+        if SEARCH_INDEX.loaded and time.monotonic() - SEARCH_INDEX.checked_at < interval:
+            return SEARCH_INDEX
+        versions = current_versions(db.session, ('movies', 'genres'))
+        if SEARCH_INDEX.loaded and versions == SEARCH_INDEX.versions:
+            SEARCH_INDEX.checked_at = time.monotonic()
+        else:
+            movies = Movie.query.options(load_only(Movie.title, Movie.description), selectinload(Movie.genres))
+            SEARCH_INDEX.load(map(movie_document, movies.all()), versions)
+    return SEARCH_INDEX
+
+
+def schedule_slot(movie):
+    """How long a showtime of movie occupies its theater, cleaning included."""
+    return slot_length(movie.runtime_minutes, app.config['DEFAULT_RUNTIME_MINUTES'], app.config['CLEANING_BUFFER_MINUTES'])
+
+
+def schedule_index(theater_id, window_start, window_end):
+    return theater_index(
+        db.session, theater_id, window_start, window_end,
+        app.config['DEFAULT_RUNTIME_MINUTES'], app.config['CLEANING_BUFFER_MINUTES']
+    )
+
+
+def catalog_importer():
+    def index_movie(movie_id, record):
+        SEARCH_INDEX.add(movie_id, record['title'], {
+            'title': record['title'], 'genres': ' '.join(record['genres']), 'description': record['description']
+        })
+    return CatalogImporter(
+        db.session, app.config['IMPORT_BATCH_SIZE'], app.config['IMPORT_MAX_ERRORS'], app.config['IMPORT_TITLE_CACHE_SIZE'],
+        app.config['DEFAULT_RUNTIME_MINUTES'], app.config['CLEANING_BUFFER_MINUTES'], on_movie=index_movie
+    )
+
+
+def movie_json(movie, fields, includes):
+    result = {'movie_id': movie.movie_id, **MOVIE_PROJECTION.values(movie, fields)}
+    if 'genres' in includes:
+        result['genres'] = [{'genre_id': g.genre_id, 'name': g.name} for g in movie.genres]
+    if 'showtimes' in includes:
+        result['showtimes'] = [{
+            'showtime_id': st.showtime_id,
+            'start_time': st.start_time.isoformat(),
+            'price': float(st.price),
+            'theater_name': st.theater.name
+        } for st in movie.showtimes]
+    return result
 
 
 # ==================== GENRE ENDPOINTS ====================
 
 @app.route('/genres', methods=['GET'])
+@conditional('genres', cache=CATALOG_CACHE)
 def get_genres():
     genres = Genre.query.all()
     return jsonify([{'genre_id': g.genre_id, 'name': g.name} for g in genres]), 200
@@ -37,40 +160,36 @@ def create_genre():
 # ==================== MOVIE ENDPOINTS ====================
 
 @app.route('/movies', methods=['GET'])
+@conditional('movies', 'genres', 'showtimes', 'theaters')
 def get_movies():
-    movies = Movie.query.all()
-    result = []
-    for movie in movies:
-        result.append({
-            'movie_id': movie.movie_id,
-            'title': movie.title,
-            'description': movie.description,
-            'poster_url': movie.poster_url,
-            'genres': [{'genre_id': g.genre_id, 'name': g.name} for g in movie.genres],
-            'showtimes': [{
-                'showtime_id': st.showtime_id,
-                'start_time': st.start_time.isoformat(),
-                'price': float(st.price),
-                'theater_name': st.theater.name
-            } for st in movie.showtimes]
-        })
-    return jsonify(result), 200
+    """One page of movies in ID order, optionally filtered by genre_id."""
+    fields, includes = MOVIE_PROJECTION.parse(request.args)
+    query = Movie.query.options(*MOVIE_PROJECTION.options(fields, includes))
+    genre_id = parse_int(request.args, 'genre_id')
+    if genre_id is not None:
+        query = query.filter(Movie.movie_id.in_(movies_with_genre(genre_id)))
+
+    limit = page_limit(request.args, app.config['PAGE_SIZE'], app.config['MAX_PAGE_SIZE'])
+    movies, next_cursor = paginate(query, [Movie.movie_id], request.args.get('cursor'), limit)
+    result = [movie_json(movie, fields, includes) for movie in movies]
+    return jsonify({'items': result, 'next_cursor': next_cursor}), 200
 
 @app.route('/movies/<int:movie_id>', methods=['GET'])
+@conditional('movies', 'genres', 'showtimes', 'theaters')
 def get_movie(movie_id):
-    movie = Movie.query.get_or_404(movie_id)
+    fields, includes = MOVIE_PROJECTION.parse(request.args)
+    movie = Movie.query.options(*MOVIE_PROJECTION.options(fields, includes)).filter_by(movie_id=movie_id).first_or_404()
+    return jsonify(movie_json(movie, fields, includes)), 200
+
+@app.route('/movies/search', methods=['GET'])
+def search_movies():
+    """Ranked type-ahead search over titles, genres and descriptions."""
+    query = request.args.get('q', '')
+    limit = page_limit(request.args, app.config['SEARCH_DEFAULT_LIMIT'], app.config['SEARCH_MAX_LIMIT'])
+    results = search_index().search(query, limit)
     return jsonify({
-        'movie_id': movie.movie_id,
-        'title': movie.title,
-        'description': movie.description,
-        'poster_url': movie.poster_url,
-        'genres': [{'genre_id': g.genre_id, 'name': g.name} for g in movie.genres],
-        'showtimes': [{
-            'showtime_id': st.showtime_id,
-            'start_time': st.start_time.isoformat(),
-            'price': float(st.price),
-            'theater_name': st.theater.name
-        } for st in movie.showtimes]
+        'query': query,
+        'results': [{'movie_id': movie_id, 'title': title, 'score': score} for movie_id, title, score in results]
     }), 200
 
 @app.route('/movies', methods=['POST'])
@@ -85,7 +204,8 @@ def create_movie():
     new_movie = Movie(
         title=data['title'],
         description=data.get('description'),
-        poster_url=data.get('poster_url')
+        poster_url=data.get('poster_url'),
+        runtime_minutes=data.get('runtime_minutes')
     )
     if data.get('genre_ids'):
         genres = Genre.query.filter(Genre.genre_id.in_(data['genre_ids'])).all()
@@ -93,8 +213,23 @@ def create_movie():
 
     db.session.add(new_movie)
     db.session.commit()
+    SEARCH_INDEX.add(*movie_document(new_movie))
     return jsonify({'message': 'Movie created', 'movie_id': new_movie.movie_id}), 201
 
+@app.route('/movies/import', methods=['POST'])
+@jwt_required()
+def import_catalog():
+    """Stream a CSV or JSONL catalog feed (format=csv|jsonl) into the database in batches."""
+    claims = get_jwt()
+    if claims.get('role') != 'ADMIN':
+        return jsonify({'message': 'Admin access required'}), 403
+
+    fmt = request.args.get('format', 'csv' if request.mimetype == 'text/csv' else 'jsonl')
+    if fmt not in FORMATS:
+        return jsonify({'message': 'format must be csv or jsonl'}), 400
+    summary = catalog_importer().run(read_records(request.stream, fmt))
+    return jsonify(summary), 200
+
 @app.route('/movies/<int:movie_id>', methods=['PUT'])
 @jwt_required()
 def update_movie(movie_id):
@@ -107,11 +242,16 @@ def update_movie(movie_id):
     movie.title = data.get('title', movie.title)
     movie.description = data.get('description', movie.description)
     movie.poster_url = data.get('poster_url', movie.poster_url)
+    movie.runtime_minutes = data.get('runtime_minutes', movie.runtime_minutes)
 
     if 'genre_ids' in data:
         movie.genres = Genre.query.filter(Genre.genre_id.in_(data['genre_ids'])).all()
 
+    if 'title' in data:
+        db.session.flush()
+        refresh_timetable(db.session.connection(), select(Showtime.showtime_id).where(Showtime.movie_id == movie_id))
     db.session.commit()
+    SEARCH_INDEX.add(*movie_document(movie))
     return jsonify({'message': 'Movie updated'}), 200
 
 @app.route('/movies/<int:movie_id>', methods=['DELETE'])
@@ -121,26 +261,35 @@ def delete_movie(movie_id):
     if claims.get('role') != 'ADMIN':
         return jsonify({'message': 'Admin access required'}), 403
 
-    movie = Movie.query.get_or_404(movie_id)
-    db.session.delete(movie)
+    # One statement: genre links, showtimes and their timetable rows go through ON DELETE CASCADE
+    if db.session.execute(delete(Movie).where(Movie.movie_id == movie_id)).rowcount == 0:
+        return jsonify({'message': 'Movie not found'}), 404
+    # Core deletes bypass the flush hook that versions ORM writes
+    bump_versions(db.session.connection(), ['movies', 'showtimes'])
     db.session.commit()
+    SEARCH_INDEX.remove(movie_id)
     return jsonify({'message': 'Movie deleted'}), 200
 
 
 # ==================== THEATER ENDPOINTS ====================
 
 @app.route('/theaters', methods=['GET'])
+@conditional('theaters', 'seats', cache=CATALOG_CACHE)
 def get_theaters():
-    theaters = Theater.query.all()
+    """One page of theaters in ID order."""
+    fields, includes = THEATER_PROJECTION.parse(request.args)
+    limit = page_limit(request.args, app.config['PAGE_SIZE'], app.config['MAX_PAGE_SIZE'])
+    theaters, next_cursor = paginate(
+        Theater.query.options(*THEATER_PROJECTION.options(fields, includes)),
+        [Theater.theater_id], request.args.get('cursor'), limit
+    )
     result = []
     for t in theaters:
-        result.append({
-            'theater_id': t.theater_id,
-            'name': t.name,
-            'total_seats': t.total_seats,
-            'seats': [{'seat_id': s.seat_id, 'row_label': s.row_label, 'seat_number': s.seat_number} for s in t.seats]
-        })
-    return jsonify(result), 200
+        item = {'theater_id': t.theater_id, **THEATER_PROJECTION.values(t, fields)}
+        if 'seats' in includes:
+            item['seats'] = [{'seat_id': s.seat_id, 'row_label': s.row_label, 'seat_number': s.seat_number} for s in t.seats]
+        result.append(item)
+    return jsonify({'items': result, 'next_cursor': next_cursor}), 200
 
 @app.route('/theaters', methods=['POST'])
 @jwt_required()
@@ -150,50 +299,113 @@ def create_theater():
         return jsonify({'message': 'Admin access required'}), 403
 
     data = request.get_json()
-    theater = Theater(name=data['name'], total_seats=data['total_seats'])
+    layout, seat_count = None, None
+    # Generate seats if rows (labels or a count) and seats_per_row are provided
+    if data.get('rows') and data.get('seats_per_row'):
+        try:
+            layout, seat_count = build_layout(
+                data['rows'], data['seats_per_row'], data.get('gaps', []), app.config['MAX_THEATER_SEATS']
+            )
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+    total_seats = data.get('total_seats', seat_count)
+    if not isinstance(total_seats, int) or isinstance(total_seats, bool) or total_seats < 0:
+        return jsonify({'message': 'total_seats or a seat layout (rows and seats_per_row) is required'}), 400
+
+    theater = Theater(name=data['name'], total_seats=total_seats)
     db.session.add(theater)
     db.session.flush()
 
-    # Auto-generate seats if rows and seats_per_row provided
-    if data.get('rows') and data.get('seats_per_row'):
-        rows = data['rows']  # e.g. ['A', 'B', 'C']
-        seats_per_row = data['seats_per_row']
-        for row in rows:
-            for num in range(1, seats_per_row + 1):
-                seat = Seat(theater_id=theater.theater_id, row_label=row, seat_number=num)
-                db.session.add(seat)
+    if layout is not None:
+        theater.layout = insert_seats(db.session, theater.theater_id, layout)
+        # Core inserts bypass the flush hook that versions ORM writes
+        bump_versions(db.session.connection(), ['seats'])
 
     db.session.commit()
     return jsonify({'message': 'Theater created', 'theater_id': theater.theater_id}), 201
 
 
+@app.route('/theaters/<int:theater_id>', methods=['DELETE'])
+@jwt_required()
+def delete_theater(theater_id):
+    """Retire a theater; its seats, showtimes and timetable rows go with it in the same statement."""
+    claims = get_jwt()
+    if claims.get('role') != 'ADMIN':
+        return jsonify({'message': 'Admin access required'}), 403
+
+    if db.session.execute(delete(Theater).where(Theater.theater_id == theater_id)).rowcount == 0:
+        return jsonify({'message': 'Theater not found'}), 404
+    bump_versions(db.session.connection(), ['theaters', 'seats', 'showtimes'])
+    db.session.commit()
+    return jsonify({'message': 'Theater deleted'}), 200
+
 # ==================== SHOWTIME ENDPOINTS ====================
 
 @app.route('/showtimes', methods=['GET'])
+@conditional('showtimes', 'movies', 'theaters', volatile=('min_available',))
 def get_showtimes():
-    movie_id = request.args.get('movie_id')
-    query = Showtime.query
-    if movie_id:
-        query = query.filter_by(movie_id=movie_id)
-
-    showtimes = query.all()
+    """One page of showtimes by start time.
+
+    Filters: movie_id, theater_id, genre_id, from (inclusive) and to (exclusive)
+    as ISO dates or datetimes, and min_available unbooked seats.
+    """
+    fields, includes = SHOWTIME_PROJECTION.parse(request.args)
+    # Bookings are owned by ReservationService, so availability is checked per fetched batch
+    min_available = parse_int(request.args, 'min_available')
+    accept = with_min_available(min_available) if min_available is not None else None
+    # The availability check needs each theater's seat count even when it is not returned
+    loads = includes | {'theater'} if accept else includes
+
+    query = Showtime.query.options(*SHOWTIME_PROJECTION.options(fields, loads))
+    movie_id = parse_int(request.args, 'movie_id')
+    if movie_id is not None:
+        query = query.filter(Showtime.movie_id == movie_id)
+    theater_id = parse_int(request.args, 'theater_id')
+    if theater_id is not None:
+        query = query.filter(Showtime.theater_id == theater_id)
+    genre_id = parse_int(request.args, 'genre_id')
+    if genre_id is not None:
+        query = query.filter(Showtime.movie_id.in_(movies_with_genre(genre_id)))
+    starts_from = parse_datetime(request.args, 'from')
+    if starts_from is not None:
+        query = query.filter(Showtime.start_time >= starts_from)
+    starts_to = parse_datetime(request.args, 'to')
+    if starts_to is not None:
+        query = query.filter(Showtime.start_time < starts_to)
+
+    limit = page_limit(request.args, app.config['PAGE_SIZE'], app.config['MAX_PAGE_SIZE'])
+    showtimes, next_cursor = paginate(
+        query, [Showtime.start_time, Showtime.showtime_id], request.args.get('cursor'), limit,
+        accept=accept, scan_limit=app.config['AVAILABILITY_SCAN_LIMIT']
+    )
     result = []
     for st in showtimes:
-        result.append({
-            'showtime_id': st.showtime_id,
-            'movie_id': st.movie_id,
-            'theater_id': st.theater_id,
-            'start_time': st.start_time.isoformat(),
-            'price': float(st.price),
-            'theater_name': st.theater.name,
-            'movie_title': st.movie.title
-        })
-    return jsonify(result), 200
+        item = {'showtime_id': st.showtime_id, **SHOWTIME_PROJECTION.values(st, fields)}
+        if 'theater' in includes:
+            item['theater_name'] = st.theater.name
+        if 'movie' in includes:
+            item['movie_title'] = st.movie.title
+        result.append(item)
+    return jsonify({'items': result, 'next_cursor': next_cursor}), 200
 
 @app.route('/showtimes/<int:showtime_id>/seats', methods=['GET'])
+@conditional('showtimes', 'theaters', 'seats', cache=CATALOG_CACHE)
 def get_showtime_seats(showtime_id):
-    """Get all seats for a showtime's theater."""
-    showtime = Showtime.query.get_or_404(showtime_id)
+    """Get all seats for a showtime's theater, as a list or (format=bitmap) as its compact layout."""
+    seat_format = request.args.get('format', 'list')
+    if seat_format not in ('list', 'bitmap'):
+        raise InvalidQuery('format must be list or bitmap')
+    showtime = Showtime.query.options(joinedload(Showtime.theater)).filter_by(showtime_id=showtime_id).first_or_404()
+
+    if seat_format == 'bitmap':
+        layout = showtime.theater.layout
+        if layout is None:
+            layout = layout_from_seats(
+                Seat.query.options(load_only(Seat.row_label, Seat.seat_number)).filter_by(theater_id=showtime.theater_id).all()
+            )
+        return jsonify({'showtime_id': showtime.showtime_id, 'theater_name': showtime.theater.name, **layout}), 200
+
     seats = Seat.query.filter_by(theater_id=showtime.theater_id).all()
     return jsonify({
         'showtime_id': showtime.showtime_id,
@@ -209,16 +421,79 @@ def create_showtime():
         return jsonify({'message': 'Admin access required'}), 403
 
     data = request.get_json()
+    try:
+        start_time = local_datetime(data['start_time'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'message': 'start_time must be an ISO 8601 datetime without a UTC offset'}), 400
+    movie = db.session.get(Movie, data['movie_id'])
+    if movie is None or lock_theater(db.session, data['theater_id']) is None:
+        return jsonify({'message': 'Movie or theater not found'}), 404
+
+    end_time = start_time + schedule_slot(movie)
+    index = schedule_index(data['theater_id'], start_time, start_time)
+    clash = index.overlapping(start_time, end_time)
+    if clash:
+        return jsonify({'message': 'Theater is already booked at that time', 'conflicts_with': clash[2]}), 409
+
     showtime = Showtime(
         movie_id=data['movie_id'],
         theater_id=data['theater_id'],
-        start_time=data['start_time'],
+        start_time=start_time,
         price=data['price']
     )
     db.session.add(showtime)
+    db.session.flush()
+    refresh_timetable(db.session.connection(), [showtime.showtime_id])
     db.session.commit()
     return jsonify({'message': 'Showtime created', 'showtime_id': showtime.showtime_id}), 201
 
+@app.route('/showtimes/schedule', methods=['POST'])
+@jwt_required()
+def schedule_showtimes():
+    """Create every showtime of a recurrence rule for one movie and theater, or none if any slot overlaps."""
+    claims = get_jwt()
+    if claims.get('role') != 'ADMIN':
+        return jsonify({'message': 'Admin access required'}), 403
+
+    data = request.get_json()
+    if any(data.get(k) is None for k in ('movie_id', 'theater_id', 'price')):
+        return jsonify({'message': 'movie_id, theater_id and price are required'}), 400
+    try:
+        starts = parse_recurrence(data, app.config['MAX_SCHEDULED_SHOWTIMES'])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    movie_id, theater_id, price = data['movie_id'], data['theater_id'], data['price']
+    movie = db.session.get(Movie, movie_id)
+    if movie is None or lock_theater(db.session, theater_id) is None:
+        return jsonify({'message': 'Movie or theater not found'}), 404
+
+    length = schedule_slot(movie)
+    index = schedule_index(theater_id, starts[0], starts[-1])
+    conflicts = []
+    for start in starts:
+        clash = index.overlapping(start, start + length)
+        if clash:
+            conflicts.append({'start_time': start.isoformat(), 'conflicts_with': clash[2] or None})
+        else:
+            index.add(start, start + length)
+    if conflicts:
+        db.session.rollback()
+        return jsonify({'message': 'Schedule overlaps existing showtimes', 'conflicts': conflicts}), 409
+
+    db.session.execute(insert(Showtime), [
+        {'movie_id': movie_id, 'theater_id': theater_id, 'start_time': start, 'price': price} for start in starts
+    ])
+    # Core inserts bypass the flush hook that versions ORM writes
+    bump_versions(db.session.connection(), ['showtimes'])
+    showtime_ids = db.session.execute(
+        select(Showtime.showtime_id)
+        .where(Showtime.theater_id == theater_id, Showtime.start_time.in_(starts))
+        .order_by(Showtime.start_time)
+    ).scalars().all()
+    refresh_timetable(db.session.connection(), showtime_ids)
+    db.session.commit()
+    return jsonify({'message': 'Showtimes scheduled', 'showtime_ids': showtime_ids}), 201
+
 @app.route('/showtimes/<int:showtime_id>', methods=['DELETE'])
 @jwt_required()
 def delete_showtime(showtime_id):
@@ -226,11 +501,89 @@ def delete_showtime(showtime_id):
     if claims.get('role') != 'ADMIN':
         return jsonify({'message': 'Admin access required'}), 403
 
-    showtime = Showtime.query.get_or_404(showtime_id)
-    db.session.delete(showtime)
+    if db.session.execute(delete(Showtime).where(Showtime.showtime_id == showtime_id)).rowcount == 0:
+        return jsonify({'message': 'Showtime not found'}), 404
+    bump_versions(db.session.connection(), ['showtimes'])
     db.session.commit()
     return jsonify({'message': 'Showtime deleted'}), 200
 
+@app.route('/showtimes/expired', methods=['DELETE'])
+@jwt_required()
+def delete_expired():
+    """Delete every showtime that started before `before` (ISO date or datetime, default now)."""
+    claims = get_jwt()
+    if claims.get('role') != 'ADMIN':
+        return jsonify({'message': 'Admin access required'}), 403
+
+    before = parse_datetime(request.args, 'before') or datetime.now()
+    deleted = delete_expired_showtimes(db.session, before, app.config['PURGE_BATCH_SIZE'])
+    return jsonify({'message': 'Expired showtimes deleted', 'deleted': deleted}), 200
+
+
+# ==================== TIMETABLE ENDPOINTS ====================
+
+@app.route('/timetable', methods=['GET'])
+def get_timetable():
+    """Showtimes of one day (date=YYYY-MM-DD, default today) grouped by theater, with remaining seats.
+
+    Remaining seats come from ReservationService; if it cannot be reached they
+    are null rather than failing the whole page.
+    """
+    try:
+        day = date.fromisoformat(request.args['date']) if 'date' in request.args else date.today()
+    except ValueError:
+        raise InvalidQuery('date must be an ISO 8601 date')
+    entries = day_timetable(db.session, day, parse_int(request.args, 'theater_id'))
+    try:
+        booked = booked_counts([e.showtime_id for e in entries])
+    except AvailabilityUnavailable:
+        booked = None
+
+    theaters = {}
+    for e in entries:
+        theater = theaters.get(e.theater_id)
+        if theater is None:
+            theater = theaters[e.theater_id] = {'theater_id': e.theater_id, 'theater_name': e.theater_name, 'showtimes': []}
+        theater['showtimes'].append({
+            'showtime_id': e.showtime_id,
+            'movie_id': e.movie_id,
+            'movie_title': e.movie_title,
+            'start_time': e.start_time.isoformat(),
+            'price': float(e.price),
+            'remaining_seats': remaining_seats(e.total_seats, booked.get(e.showtime_id, 0)) if booked is not None else None
+        })
+    return jsonify({'date': day.isoformat(), 'theaters': list(theaters.values())}), 200
+
+
+# ==================== CACHE ENDPOINTS ====================
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Size and hit ratio of the catalog response cache in this process."""
+    return jsonify(CATALOG_CACHE.stats()), 200
+
+
+# ==================== CLI ====================
+
+@app.cli.command('import-catalog')
+@click.argument('feed', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help='Feed format; guessed from the file extension by default.')
+def import_catalog_command(feed, fmt):
+    """Import movies, genres and showtimes from a CSV or JSONL FEED file."""
+    fmt = fmt or ('csv' if feed.name.endswith('.csv') else 'jsonl')
+    summary = catalog_importer().run(read_records(feed, fmt))
+    for error in summary.pop('errors'):
+        click.echo(f"row {error['row']}: {error['message']}", err=True)
+    click.echo(', '.join(f'{key}={value}' for key, value in summary.items()))
+
+
+@app.cli.command('purge-showtimes')
+@click.option('--before', type=click.DateTime(), help='Delete showtimes starting before this time; now by default.')
+def purge_showtimes_command(before):
+    """Delete expired showtimes in batches of PURGE_BATCH_SIZE."""
+    deleted = delete_expired_showtimes(db.session, before or datetime.now(), app.config['PURGE_BATCH_SIZE'])
+    click.echo(f'deleted={deleted}')
+
 
 if __name__ == '__main__':
     app.run(port=5003, debug=True)
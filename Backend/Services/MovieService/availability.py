@@ -0,0 +1,45 @@
+import requests
+from flask import current_app
+
+# Bookings live in ReservationService; one pooled session is shared by all request threads
+SESSION = requests.Session()
+SESSION.trust_env = False
+
+
+class AvailabilityUnavailable(Exception):
+    """Raised when booked seat counts cannot be fetched from ReservationService."""
+
+
+def booked_counts(showtime_ids):
+    """Number of booked seats per showtime ID, in one call to ReservationService per BOOKED_COUNTS_BATCH_SIZE IDs."""
+    showtime_ids = list(showtime_ids)
+    batch_size = current_app.config['BOOKED_COUNTS_BATCH_SIZE']
+    counts = {}
+    for start in range(0, len(showtime_ids), batch_size):
+        try:
+            resp = SESSION.get(
+                f"{current_app.config['RESERVATION_SERVICE_URL']}/reservations/booked-counts",
+                params={'showtime_ids': ','.join(str(i) for i in showtime_ids[start:start + batch_size])},
+                timeout=current_app.config['RESERVATION_SERVICE_TIMEOUT']
+            )
+            resp.raise_for_status()
+            counts.update(resp.json()['booked_counts'])
+        except (requests.RequestException, ValueError, KeyError) as e:
+            raise AvailabilityUnavailable(str(e))
+    return {int(showtime_id): count for showtime_id, count in counts.items()}
+
+
+def remaining_seats(total_seats, booked):
+    """Unbooked seats, never below 0 even if bookings name seats the theater no longer has."""
+    return max(total_seats - booked, 0)
+
+
+def with_min_available(minimum):
+    """Batch filter keeping showtimes with at least minimum unbooked seats."""
+    def accept(showtimes):
+        counts = booked_counts([st.showtime_id for st in showtimes])
+        return [
+            st for st in showtimes
+            if remaining_seats(st.theater.total_seats, counts.get(st.showtime_id, 0)) >= minimum
+        ]
+    return accept
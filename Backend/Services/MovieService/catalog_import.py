@@ -0,0 +1,246 @@
+"""Streaming bulk import of movies, their genres and showtimes from CSV or JSONL feeds.
+
+Each record is one movie: title, description, poster_url, runtime_minutes and
+genres (a list, or names separated by "|"), with either a showtimes list of
+{theater_id, start_time, price} (JSONL) or one showtime in theater_id,
+start_time and price columns (CSV). A movie whose title already exists is
+reused, so a CSV feed may list one showtime per row. Records are read and
+written batch by batch, so memory use does not grow with the size of the feed.
+"""
+import csv
+import io
+import json
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import Genre, Movie, Showtime, Theater, movie_genres
+from pagination import local_datetime
+from scheduling import lock_theater, slot_length, theater_index
+from timetable import refresh_timetable
+from versioning import bump_versions
+
+FORMATS = ('csv', 'jsonl')
+
+
+def read_records(stream, fmt):
+    """Yield (row number, record) from a binary stream without reading it all into memory."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        for row, record in enumerate(csv.DictReader(text), start=2):
+            yield row, record
+    else:
+        for row, line in enumerate(text, start=1):
+            if line.strip():
+                yield row, line
+
+
+def _optional(value):
+    return None if value in (None, '') else value
+
+
+class CatalogImporter:
+    """Import records in batched transactions, collecting per-row errors instead of stopping."""
+
+    def __init__(self, session, batch_size, max_errors, title_cache_size,
+                 default_runtime, buffer_minutes, on_movie=None):
+        self.session = session
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.title_cache_size = title_cache_size
+        self.default_runtime = default_runtime
+        self.buffer_minutes = buffer_minutes
+        # Called with each committed new movie, e.g. to update the search index
+        self.on_movie = on_movie
+        self.genre_ids = {name.lower(): genre_id for genre_id, name in session.execute(select(Genre.genre_id, Genre.name))}
+        self.theater_ids = set(session.execute(select(Theater.theater_id)).scalars())
+        # Recently seen titles only; older ones are looked up again per batch
+        self.movie_ids = OrderedDict()
+        self.summary = {
+            'rows': 0, 'failed_rows': 0, 'movies_created': 0,
+            'genres_created': 0, 'showtimes_created': 0, 'errors': []
+        }
+
+    def run(self, records):
+        batch = []
+        for row, record in records:
+            self.summary['rows'] += 1
+            try:
+                batch.append((row, self._parse(record)))
+            except ValueError as e:
+                self._error(row, str(e))
+            if len(batch) >= self.batch_size:
+                self._commit(batch)
+                batch = []
+        if batch:
+            self._commit(batch)
+        return self.summary
+
+    def _error(self, row, message):
+        self.summary['failed_rows'] += 1
+        if len(self.summary['errors']) < self.max_errors:
+            self.summary['errors'].append({'row': row, 'message': message})
+
+    def _parse(self, record):
+        if isinstance(record, str):
+            try:
+                record = json.loads(record)
+            except ValueError:
+                raise ValueError('Invalid JSON')
+        if not isinstance(record, dict) or not _optional(record.get('title')):
+            raise ValueError('title is required')
+
+        genres = record.get('genres') or []
+        if isinstance(genres, str):
+            genres = genres.split('|')
+        showtimes = record.get('showtimes')
+        if showtimes is None:
+            showtimes = [record] if _optional(record.get('start_time')) else []
+
+        runtime = _optional(record.get('runtime_minutes'))
+        try:
+            runtime = int(runtime) if runtime is not None else None
+        except (TypeError, ValueError):
+            raise ValueError('runtime_minutes must be an integer')
+        try:
+            return {
+                'title': record['title'].strip(),
+                'description': _optional(record.get('description')),
+                'poster_url': _optional(record.get('poster_url')),
+                'runtime_minutes': runtime,
+                'genres': list(dict.fromkeys(g.strip() for g in genres if g.strip())),
+                'showtimes': [self._parse_showtime(s) for s in showtimes]
+            }
+        except (TypeError, AttributeError, KeyError):
+            raise ValueError('Malformed record')
+
+    def _parse_showtime(self, showtime):
+        try:
+            theater_id = int(showtime['theater_id'])
+            start_time = local_datetime(showtime['start_time'])
+            price = Decimal(str(showtime['price']))
+        except (KeyError, TypeError, ValueError, InvalidOperation):
+            raise ValueError('Showtimes need theater_id, an ISO 8601 start_time without a UTC offset and price')
+        if theater_id not in self.theater_ids:
+            raise ValueError(f'Theater {theater_id} does not exist')
+        return theater_id, start_time, price
+
+    def _commit(self, batch):
+        """Write a batch in one transaction; if it fails, retry its rows one by one to isolate the bad ones."""
+        try:
+            created = self._write(batch)
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            if len(batch) == 1:
+                self._error(batch[0][0], f'Database error: {e.__class__.__name__}')
+            else:
+                for item in batch:
+                    self._commit([item])
+            return
+
+        genres, movies, showtimes, row_errors = created
+        self.genre_ids.update(genres)
+        for title, movie_id in movies.items():
+            self._remember(title, movie_id)
+        self.summary['genres_created'] += len(genres)
+        self.summary['movies_created'] += len(movies)
+        self.summary['showtimes_created'] += showtimes
+        for row, message in row_errors:
+            self._error(row, message)
+        if self.on_movie:
+            for _, record in batch:
+                if record['title'] in movies:
+                    self.on_movie(movies[record['title']], record)
+
+    def _remember(self, title, movie_id):
+        self.movie_ids[title] = movie_id
+        self.movie_ids.move_to_end(title)
+        if len(self.movie_ids) > self.title_cache_size:
+            self.movie_ids.popitem(last=False)
+
+    def _write(self, batch):
+        """Insert a batch; return (new genre ids, new movie ids by title, showtime count, row errors)."""
+        session = self.session
+        records = [record for _, record in batch]
+
+        # Genres: resolved through the name -> id map, creating only unseen names
+        new_genres = {}
+        for record in records:
+            for name in record['genres']:
+                if name.lower() not in self.genre_ids and name.lower() not in new_genres:
+                    new_genres[name.lower()] = Genre(name=name)
+        session.add_all(new_genres.values())
+        session.flush()
+        genre_ids = {key: genre.genre_id for key, genre in new_genres.items()}
+
+        # Movies: reuse existing titles, create the rest
+        titles = {r['title'] for r in records}
+        movie_ids = {t: self.movie_ids[t] for t in titles if t in self.movie_ids}
+        unknown = titles - movie_ids.keys()
+        if unknown:
+            for movie_id, title in session.execute(select(Movie.movie_id, Movie.title).where(Movie.title.in_(unknown))):
+                movie_ids.setdefault(title, movie_id)
+        new_movies = {}
+        for record in records:
+            if record['title'] not in movie_ids and record['title'] not in new_movies:
+                new_movies[record['title']] = (Movie(
+                    title=record['title'], description=record['description'],
+                    poster_url=record['poster_url'], runtime_minutes=record['runtime_minutes']
+                ), record)
+        session.add_all(movie for movie, _ in new_movies.values())
+        session.flush()
+        created_movies = {title: movie.movie_id for title, (movie, _) in new_movies.items()}
+        movie_ids.update(created_movies)
+
+        links = [
+            {'movie_id': created_movies[title], 'genre_id': self.genre_ids.get(name.lower()) or genre_ids[name.lower()]}
+            for title, (_, record) in new_movies.items() for name in record['genres']
+        ]
+        if links:
+            session.execute(insert(movie_genres), links)
+
+        # Showtimes: checked against each theater's schedule like any other
+        row_errors = []
+        showtimes = []
+        scheduled = {movie_ids[r['title']] for r in records if r['showtimes']}
+        runtimes = dict(session.execute(
+            select(Movie.movie_id, Movie.runtime_minutes).where(Movie.movie_id.in_(scheduled))
+        ).all()) if scheduled else {}
+        indexes = self._theater_indexes(records)
+        for row, record in batch:
+            movie_id = movie_ids[record['title']]
+            for theater_id, start_time, price in record['showtimes']:
+                end_time = start_time + slot_length(runtimes[movie_id], self.default_runtime, self.buffer_minutes)
+                clash = indexes[theater_id].overlapping(start_time, end_time)
+                if clash:
+                    row_errors.append((row, f'Showtime at {start_time.isoformat()} overlaps another in theater {theater_id}; skipped'))
+                    continue
+                indexes[theater_id].add(start_time, end_time)
+                showtimes.append({'movie_id': movie_id, 'theater_id': theater_id, 'start_time': start_time, 'price': price})
+        if showtimes:
+            session.execute(insert(Showtime), showtimes)
+            slots = [(s['theater_id'], s['start_time']) for s in showtimes]
+            refresh_timetable(session.connection(), select(Showtime.showtime_id).where(
+                tuple_(Showtime.theater_id, Showtime.start_time).in_(slots)
+            ))
+        # Core inserts bypass the flush hook that versions ORM writes
+        bump_versions(session.connection(), (['movies'] if links else []) + (['showtimes'] if showtimes else []))
+        return genre_ids, created_movies, len(showtimes), row_errors
+
+    def _theater_indexes(self, records):
+        windows = {}
+        for record in records:
+            for theater_id, start_time, _ in record['showtimes']:
+                low, high = windows.get(theater_id, (start_time, start_time))
+                windows[theater_id] = (min(low, start_time), max(high, start_time))
+        indexes = {}
+        for theater_id in sorted(windows):
+            lock_theater(self.session, theater_id)
+            low, high = windows[theater_id]
+            indexes[theater_id] = theater_index(
+                self.session, theater_id, low, high, self.default_runtime, self.buffer_minutes
+            )
+        return indexes
@@ -8,3 +8,41 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'mysql+pymysql://root:@localhost/movie_db')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev_jwt_secret_key')
+
+    # Listing pages; clients follow next_cursor for the rest
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', '50'))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '200'))
+    # Most showtimes examined for one page of a min_available query
+    AVAILABILITY_SCAN_LIMIT = int(os.getenv('AVAILABILITY_SCAN_LIMIT', '1000'))
+
+    RESERVATION_SERVICE_URL = os.getenv('RESERVATION_SERVICE_URL', 'http://localhost:5004')
+    RESERVATION_SERVICE_TIMEOUT = float(os.getenv('RESERVATION_SERVICE_TIMEOUT', '2'))
+    # Showtime IDs per booked-counts call; must not exceed ReservationService's MAX_BOOKED_COUNT_IDS
+    BOOKED_COUNTS_BATCH_SIZE = int(os.getenv('BOOKED_COUNTS_BATCH_SIZE', '500'))
+
+    # Movie search: prefix terms expanded per query word, and result limits
+    SEARCH_MAX_PREFIX_TERMS = int(os.getenv('SEARCH_MAX_PREFIX_TERMS', '100'))
+    SEARCH_DEFAULT_LIMIT = int(os.getenv('SEARCH_DEFAULT_LIMIT', '10'))
+    SEARCH_MAX_LIMIT = int(os.getenv('SEARCH_MAX_LIMIT', '50'))
+    # Seconds between checks for catalog writes made by other replicas; 0 when running a single replica
+    SEARCH_REFRESH_INTERVAL = float(os.getenv('SEARCH_REFRESH_INTERVAL', '0'))
+
+    # Largest layout create_theater will generate seats for
+    MAX_THEATER_SEATS = int(os.getenv('MAX_THEATER_SEATS', '10000'))
+
+    # A showtime occupies its theater for the movie's runtime (or this default) plus cleaning
+    DEFAULT_RUNTIME_MINUTES = int(os.getenv('DEFAULT_RUNTIME_MINUTES', '120'))
+    CLEANING_BUFFER_MINUTES = int(os.getenv('CLEANING_BUFFER_MINUTES', '20'))
+    MAX_SCHEDULED_SHOWTIMES = int(os.getenv('MAX_SCHEDULED_SHOWTIMES', '1000'))
+
+    # Catalog import: rows per transaction, errors reported, and titles remembered between batches
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+    IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', '1000'))
+    IMPORT_TITLE_CACHE_SIZE = int(os.getenv('IMPORT_TITLE_CACHE_SIZE', '10000'))
+
+    # Serialized genre, theater and seat-layout responses kept per process
+    CATALOG_CACHE_MAX_ENTRIES = int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', '1024'))
+    CATALOG_CACHE_MAX_BYTES = int(os.getenv('CATALOG_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+    # Expired showtimes deleted per transaction
+    PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', '1000'))
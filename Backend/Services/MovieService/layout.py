@@ -0,0 +1,115 @@
+"""Compact theater layouts: row labels x seats per row, with a mask of positions that have no seat.
+
+Positions are numbered row-major (row * seats_per_row + column). Bitsets are
+base64-encoded with position 0 in the most significant bit of the first byte.
+Seats of a layout get consecutive IDs in position order, skipping gaps, so the
+k-th seat of the layout has seat_id first_seat_id + k.
+"""
+import base64
+from string import ascii_uppercase
+
+from sqlalchemy import insert, select
+
+from models import Seat
+
+
+def row_labels(count):
+    """Spreadsheet-style labels: A..Z, then AA, AB, ..."""
+    labels = []
+    for n in range(1, count + 1):
+        label = ''
+        while n:
+            n, rest = divmod(n - 1, 26)
+            label = ascii_uppercase[rest] + label
+        labels.append(label)
+    return labels
+
+
+def encode_bitset(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for p in positions:
+        bits[p // 8] |= 0x80 >> (p % 8)
+    return base64.b64encode(bytes(bits)).decode()
+
+
+def decode_bitset(encoded, size):
+    bits = base64.b64decode(encoded) if encoded else b''
+    return {p for p in range(min(size, len(bits) * 8)) if bits[p // 8] & (0x80 >> (p % 8))}
+
+
+def build_layout(rows, seats_per_row, gaps=(), max_seats=None, row_label_length=8):
+    """Validate a layout request; return (layout, seat count) or raise ValueError.
+
+    rows is a row count or a list of row labels; gaps lists [row_label, seat_number]
+    positions that have no seat (aisles, missing seats).
+    """
+    row_count = rows if isinstance(rows, int) else len(rows) if isinstance(rows, list) else 0
+    if row_count < 1 or not isinstance(seats_per_row, int) or seats_per_row < 1:
+        raise ValueError('rows and a positive seats_per_row are required')
+    # Checked before any labels or bitsets are built, so an oversized request costs nothing
+    if max_seats is not None and row_count * seats_per_row > max_seats:
+        raise ValueError(f'A theater may have at most {max_seats} seats')
+    labels = row_labels(rows) if isinstance(rows, int) else [str(r) for r in rows]
+    if len(set(labels)) != len(labels) or any(not 0 < len(l) <= row_label_length for l in labels):
+        raise ValueError(f'Row labels must be unique and 1-{row_label_length} characters long')
+
+    index = {label: i for i, label in enumerate(labels)}
+    gap_positions = set()
+    for gap in gaps:
+        try:
+            label, number = gap
+            row, number = index[str(label)], int(number)
+        except (ValueError, TypeError, KeyError):
+            raise ValueError(f'Invalid gap {gap!r}')
+        if not 1 <= number <= seats_per_row:
+            raise ValueError(f'Invalid gap {gap!r}')
+        gap_positions.add(row * seats_per_row + number - 1)
+
+    size = len(labels) * seats_per_row
+    seat_count = size - len(gap_positions)
+    layout = {'rows': labels, 'seats_per_row': seats_per_row, 'gaps': encode_bitset(gap_positions, size)}
+    return layout, seat_count
+
+
+def layout_from_seats(seats):
+    """Compact layout of a theater created before layouts were stored.
+
+    Its seat IDs need not be consecutive, so they are listed in position order
+    as seat_ids instead of being given as first_seat_id.
+    """
+    labels = sorted({s.row_label for s in seats}, key=lambda label: (len(label), label))
+    seats_per_row = max((s.seat_number for s in seats), default=0)
+    row_index = {label: i for i, label in enumerate(labels)}
+    by_position = {row_index[s.row_label] * seats_per_row + s.seat_number - 1: s.seat_id for s in seats}
+    size = len(labels) * seats_per_row
+    return {
+        'rows': labels,
+        'seats_per_row': seats_per_row,
+        'gaps': encode_bitset(set(range(size)) - by_position.keys(), size),
+        'seat_ids': [by_position[p] for p in sorted(by_position)]
+    }
+
+
+def insert_seats(session, theater_id, layout):
+    """Create every seat of layout in one multi-row INSERT and record the first seat ID in it.
+
+    IDs are allocated explicitly as one consecutive block so seats can be addressed
+    by position. Locking the highest existing seat (and the gap after it) keeps
+    concurrent allocations from overlapping.
+    """
+    last_id = session.execute(
+        select(Seat.seat_id).order_by(Seat.seat_id.desc()).limit(1).with_for_update()
+    ).scalar() or 0
+    labels, seats_per_row = layout['rows'], layout['seats_per_row']
+    gaps = decode_bitset(layout['gaps'], len(labels) * seats_per_row)
+    seats = [
+        {'theater_id': theater_id, 'row_label': label, 'seat_number': column + 1}
+        for row, label in enumerate(labels)
+        for column in range(seats_per_row)
+        if row * seats_per_row + column not in gaps
+    ]
+    for offset, seat in enumerate(seats, start=1):
+        seat['seat_id'] = last_id + offset
+    if seats:
+        session.execute(insert(Seat), seats)
+    return {**layout, 'first_seat_id': last_id + 1}
@@ -0,0 +1,32 @@
+"""Add table versions for catalog ETags
+
+Revision ID: 3f1c2a9d7e41
+Revises: b09c22ce030f
+Create Date: 2026-10-18 10:12:44.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7e41'
+down_revision = 'b09c22ce030f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table_versions = op.create_table('table_versions',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(table_versions, [
+        {'table_name': name, 'version': 0}
+        for name in ('genres', 'movies', 'theaters', 'seats', 'showtimes')
+    ])
+
+
+def downgrade():
+    op.drop_table('table_versions')
@@ -20,24 +20,28 @@ class Movie(db.Model):
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     poster_url = db.Column(db.String(500))
+    runtime_minutes = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     genres = db.relationship('Genre', secondary=movie_genres, lazy='subquery',
                              backref=db.backref('movies', lazy=True))
-    showtimes = db.relationship('Showtime', backref='movie', cascade='all, delete-orphan', lazy=True)
+    # Children are removed by the database's ON DELETE CASCADE, never loaded just to be deleted
+    showtimes = db.relationship('Showtime', backref='movie', cascade='all, delete-orphan', passive_deletes=True, lazy=True)
 
 class Theater(db.Model):
     __tablename__ = 'theaters'
     theater_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     total_seats = db.Column(db.Integer, nullable=False)
-    seats = db.relationship('Seat', backref='theater', cascade='all, delete-orphan', lazy=True)
-    showtimes = db.relationship('Showtime', backref='theater', cascade='all, delete-orphan', lazy=True)
+    # Compact seat layout (see layout.py); null for theaters whose seats were added one by one
+    layout = db.Column(db.JSON)
+    seats = db.relationship('Seat', backref='theater', cascade='all, delete-orphan', passive_deletes=True, lazy=True)
+    showtimes = db.relationship('Showtime', backref='theater', cascade='all, delete-orphan', passive_deletes=True, lazy=True)
 
 class Seat(db.Model):
     __tablename__ = 'seats'
     seat_id = db.Column(db.Integer, primary_key=True)
     theater_id = db.Column(db.Integer, db.ForeignKey('theaters.theater_id', ondelete='CASCADE'), nullable=False)
-    row_label = db.Column(db.String(1), nullable=False)
+    row_label = db.Column(db.String(8), nullable=False)
     seat_number = db.Column(db.Integer, nullable=False)
     
     __table_args__ = (db.UniqueConstraint('theater_id', 'row_label', 'seat_number', name='unique_seat_per_theater'),)
@@ -49,3 +53,32 @@ class Showtime(db.Model):
     theater_id = db.Column(db.Integer, db.ForeignKey('theaters.theater_id', ondelete='CASCADE'), nullable=False)
     start_time = db.Column(db.DateTime, nullable=False)
     price = db.Column(db.Numeric(10, 2), nullable=False)
+
+    # Keyset pagination sorts by start time, usually within one movie or theater
+    __table_args__ = (
+        db.Index('ix_showtimes_movie_start', 'movie_id', 'start_time'),
+        db.Index('ix_showtimes_theater_start', 'theater_id', 'start_time'),
+        db.Index('ix_showtimes_start_time', 'start_time'),
+    )
+
+class TimetableEntry(db.Model):
+    """Read model of showtimes by day and theater, kept in step with showtimes by timetable.py."""
+    __tablename__ = 'timetable_entries'
+    showtime_id = db.Column(db.Integer, db.ForeignKey('showtimes.showtime_id', ondelete='CASCADE'), primary_key=True)
+    show_date = db.Column(db.Date, nullable=False)
+    theater_id = db.Column(db.Integer, nullable=False)
+    theater_name = db.Column(db.String(100), nullable=False)
+    total_seats = db.Column(db.Integer, nullable=False)
+    movie_id = db.Column(db.Integer, nullable=False)
+    movie_title = db.Column(db.String(255), nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_timetable_date_theater_start', 'show_date', 'theater_id', 'start_time'),
+    )
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
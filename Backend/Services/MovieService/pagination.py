@@ -0,0 +1,111 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+class InvalidQuery(ValueError):
+    """Raised when a listing's paging or filter arguments cannot be parsed."""
+
+
+def page_limit(args, default, maximum):
+    try:
+        limit = int(args.get('limit', default))
+    except ValueError:
+        raise InvalidQuery('limit must be an integer')
+    if limit < 1:
+        raise InvalidQuery('limit must be positive')
+    return min(limit, maximum)
+
+
+def local_datetime(value):
+    """Parse an ISO 8601 date or datetime without a UTC offset; raise ValueError otherwise.
+
+    Showtimes are stored as naive local times, so an offset cannot be honoured
+    and is refused rather than silently dropped or compared against naive values.
+    """
+    if not isinstance(value, str):
+        raise ValueError('not a string')
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        raise ValueError('UTC offsets are not supported')
+    return parsed
+
+
+def parse_datetime(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return local_datetime(value)
+    except ValueError:
+        raise InvalidQuery(f'{name} must be an ISO 8601 date or datetime without a UTC offset')
+
+
+def parse_int(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidQuery(f'{name} must be an integer')
+
+
+def encode_cursor(values):
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, order_by):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if not isinstance(values, list) or len(values) != len(order_by):
+            raise ValueError
+        return [
+            datetime.fromisoformat(v) if attr.type.python_type is datetime else v
+            for attr, v in zip(order_by, values)
+        ]
+    except (ValueError, TypeError):
+        raise InvalidQuery('Invalid cursor')
+
+
+def keyset_after(order_by, values):
+    """Rows strictly after values in the (ascending) order_by sort, as an index-friendly OR of ANDs."""
+    return or_(*(
+        and_(*(a == v for a, v in zip(order_by[:i], values[:i])), attr > value)
+        for i, (attr, value) in enumerate(zip(order_by, values))
+    ))
+
+
+def paginate(query, order_by, cursor, limit, accept=None, scan_limit=None):
+    """Return one page of rows after cursor, sorted by order_by, and the cursor of the next page.
+
+    order_by must end in a unique column so the sort is stable. accept optionally
+    filters each fetched batch on data the database cannot see; at most scan_limit
+    rows are examined for one page, after which a short page is returned with a
+    cursor to carry on from.
+    """
+    after = decode_cursor(cursor, order_by) if cursor else None
+    page = []
+    scanned = 0
+    while True:
+        batch_query = query.filter(keyset_after(order_by, after)) if after else query
+        batch = batch_query.order_by(*order_by).limit(limit + 1).all()
+        candidates = batch[:limit]
+        kept = {id(row) for row in (accept(candidates) if accept else candidates)}
+
+        for i, row in enumerate(candidates):
+            after = [getattr(row, attr.key) for attr in order_by]
+            if id(row) in kept:
+                page.append(row)
+                if len(page) == limit:
+                    more = i < len(candidates) - 1 or len(batch) > limit
+                    return page, encode_cursor(after) if more else None
+
+        scanned += len(candidates)
+        if len(batch) <= limit:
+            return page, None
+        if scan_limit is not None and scanned >= scan_limit:
+            return page, encode_cursor(after)
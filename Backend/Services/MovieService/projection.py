@@ -0,0 +1,67 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy.orm import load_only, lazyload
+
+from pagination import InvalidQuery
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _names(args, name, allowed):
+    value = args.get(name)
+    if value is None:
+        return None
+    names = {n.strip() for n in value.split(',') if n.strip()}
+    unknown = sorted(names - set(allowed))
+    if unknown:
+        raise InvalidQuery(f"Unknown {name}: {', '.join(unknown)}")
+    return names
+
+
+class Projection:
+    """The columns and relationships of one resource a client may ask for with fields= and include=.
+
+    Without either argument every field and relationship is returned. fields alone
+    drops all relationships that are not also named in include; include alone keeps
+    every column. Only what was asked for is loaded from the database.
+    """
+
+    def __init__(self, keys, columns, relationships):
+        # keys: columns always loaded (primary key and sort key)
+        # columns: field name -> mapped column
+        # relationships: include name -> (relationship attribute, loader option)
+        self.keys = keys
+        self.columns = columns
+        self.relationships = relationships
+
+    def parse(self, args):
+        """Return the (fields, includes) requested in the query string."""
+        fields = _names(args, 'fields', self.columns)
+        includes = _names(args, 'include', self.relationships)
+        if fields is None:
+            fields = set(self.columns)
+            if includes is None:
+                includes = set(self.relationships)
+        elif includes is None:
+            includes = set()
+        return fields, includes
+
+    def options(self, fields, includes):
+        """Loader options that fetch exactly the requested columns and relationships."""
+        columns = list(self.keys) + [self.columns[f] for f in sorted(fields) if self.columns[f] not in self.keys]
+        options = [load_only(*columns)]
+        for name, (relationship, loader) in self.relationships.items():
+            # Overrides eager loading configured on the relationship itself
+            options.append(loader if name in includes else lazyload(relationship))
+        return options
+
+    def values(self, row, fields):
+        """JSON-ready values of the requested columns of row."""
+        return {f: _json_value(getattr(row, self.columns[f].key)) for f in fields}
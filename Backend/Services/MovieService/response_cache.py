@@ -0,0 +1,65 @@
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Serialized GET responses keyed by request path, each valid for one set of table versions.
+
+    An entry is only served while the versions it was rendered from are current,
+    so writes made by any replica invalidate it through the table_versions bump
+    of their own transaction. Least recently used paths are evicted first once
+    max_entries or max_bytes is exceeded.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # path -> (digest, body, mimetype)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path, digest):
+        """The (body, mimetype) cached for path at digest, or None."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != digest:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, path, digest, body, mimetype):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(path)
+            self._entries[path] = (digest, body, mimetype)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+            }
+
+    def _discard(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
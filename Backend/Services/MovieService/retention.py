@@ -0,0 +1,25 @@
+from sqlalchemy import delete, select
+
+from models import Showtime
+from versioning import bump_versions
+
+
+def delete_expired_showtimes(session, before, batch_size):
+    """Delete showtimes starting before `before`, batch_size rows per transaction; return how many.
+
+    Each batch is one DELETE by primary key. Timetable rows go with their
+    showtimes through ON DELETE CASCADE, and short transactions keep the locks
+    they take from stalling concurrent scheduling.
+    """
+    deleted = 0
+    while True:
+        ids = session.execute(
+            select(Showtime.showtime_id).where(Showtime.start_time < before)
+            .order_by(Showtime.start_time).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return deleted
+        session.execute(delete(Showtime).where(Showtime.showtime_id.in_(ids)))
+        bump_versions(session.connection(), ['showtimes'])
+        session.commit()
+        deleted += len(ids)
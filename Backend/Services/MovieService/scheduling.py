@@ -0,0 +1,90 @@
+from bisect import bisect_left, insort
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import func, select
+
+from models import Movie, Showtime, Theater
+
+DAY_NAMES = ('MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN')
+
+
+def parse_recurrence(data, max_slots):
+    """Start times described by a recurrence rule; raise ValueError if it is malformed.
+
+    The rule has start_date and end_date (inclusive, ISO dates), times ("HH:MM")
+    and optionally days (MON..SUN; every day when omitted).
+    """
+    try:
+        first = date.fromisoformat(data['start_date'])
+        last = date.fromisoformat(data['end_date'])
+        times = sorted({time.fromisoformat(t) for t in data['times']})
+        days = {DAY_NAMES.index(d.upper()) for d in data.get('days', DAY_NAMES)}
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise ValueError('start_date, end_date, times and optional days (MON..SUN) are required')
+    if last < first or not times:
+        raise ValueError('end_date must not be before start_date and times must not be empty')
+    if any(t.tzinfo is not None for t in times):
+        raise ValueError('times must not carry a UTC offset')
+
+    starts = []
+    day = first
+    while day <= last:
+        if day.weekday() in days:
+            starts.extend(datetime.combine(day, t) for t in times)
+            if len(starts) > max_slots:
+                raise ValueError(f'A schedule may create at most {max_slots} showtimes')
+        day += timedelta(days=1)
+    if not starts:
+        raise ValueError('The rule does not produce any showtimes')
+    return starts
+
+
+class IntervalIndex:
+    """Occupied [start, end) intervals of one theater, sorted by start, for overlap checks."""
+
+    def __init__(self):
+        self._intervals = []  # (start, end, showtime_id)
+        self._longest = timedelta(0)
+
+    def add(self, start, end, showtime_id=None):
+        insort(self._intervals, (start, end, showtime_id or 0))
+        self._longest = max(self._longest, end - start)
+
+    def overlapping(self, start, end):
+        """The interval overlapping [start, end), if any."""
+        i = bisect_left(self._intervals, (end,))
+        # Only intervals starting within the longest interval length before end can reach past start
+        while i > 0 and self._intervals[i - 1][0] > start - self._longest:
+            i -= 1
+            if self._intervals[i][1] > start:
+                return self._intervals[i]
+        return None
+
+
+def slot_length(runtime_minutes, default_runtime, buffer_minutes):
+    return timedelta(minutes=(runtime_minutes or default_runtime) + buffer_minutes)
+
+
+def lock_theater(session, theater_id):
+    """Lock the theater row so concurrent scheduling for it runs one at a time; None if it does not exist."""
+    return session.execute(
+        select(Theater.theater_id).where(Theater.theater_id == theater_id).with_for_update()
+    ).scalar()
+
+
+def theater_index(session, theater_id, window_start, window_end, default_runtime, buffer_minutes):
+    """Interval index of the theater's showtimes that could overlap slots starting between window_start and window_end."""
+    runtime = func.coalesce(Movie.runtime_minutes, default_runtime)
+    longest = session.execute(select(func.max(runtime)).select_from(Movie)).scalar() or default_runtime
+    reach = slot_length(longest, default_runtime, buffer_minutes)
+    rows = session.execute(
+        select(Showtime.showtime_id, Showtime.start_time, Movie.runtime_minutes)
+        .join(Movie, Movie.movie_id == Showtime.movie_id)
+        .where(Showtime.theater_id == theater_id,
+               Showtime.start_time > window_start - reach,
+               Showtime.start_time < window_end + reach)
+    ).all()
+    index = IntervalIndex()
+    for showtime_id, start, runtime_minutes in rows:
+        index.add(start, start + slot_length(runtime_minutes, default_runtime, buffer_minutes), showtime_id)
+    return index
@@ -0,0 +1,135 @@
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+# How much a term found in each field counts towards a movie's score
+FIELD_WEIGHTS = (('title', 3.0), ('genres', 2.0), ('description', 1.0))
+
+# A query word that only prefixes a term scores this fraction of an exact match
+PREFIX_FACTOR = 0.5
+
+WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower-cased, accent-stripped words of text."""
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', text.lower())
+    return WORD.findall(''.join(c for c in text if not unicodedata.combining(c)))
+
+
+def movie_document(movie):
+    """The searchable parts of a Movie, as passed to SearchIndex.add."""
+    return movie.movie_id, movie.title, {
+        'title': movie.title,
+        'genres': ' '.join(g.name for g in movie.genres),
+        'description': movie.description
+    }
+
+
+class SearchIndex:
+    """In-process inverted index over movie titles, genres and descriptions.
+
+    Every query word matches terms it equals or prefixes, and a movie must match
+    all words of the query. Writes update the postings of a single movie, so the
+    index never needs a rebuild to stay current with this process's own writes.
+    """
+
+    def __init__(self, max_prefix_terms):
+        self.max_prefix_terms = max_prefix_terms
+        self.loaded = False
+        # Table versions the index was built from, and when they were last compared
+        self.versions = None
+        self.checked_at = 0.0
+        self._postings = {}  # term -> {movie_id: weight}
+        self._terms = []  # every term, sorted, for prefix lookups
+        self._documents = {}  # movie_id -> (title, terms)
+        self._lock = threading.Lock()
+
+    def load(self, documents, versions=None):
+        """Replace the whole index with documents built by movie_document."""
+        postings, indexed = {}, {}
+        for movie_id, title, fields in documents:
+            weights = self._weights(fields)
+            for term, weight in weights.items():
+                postings.setdefault(term, {})[movie_id] = weight
+            indexed[movie_id] = (title, tuple(weights))
+        with self._lock:
+            self._postings = postings
+            self._terms = sorted(postings)
+            self._documents = indexed
+            self.versions = versions
+            self.checked_at = time.monotonic()
+            self.loaded = True
+
+    def add(self, movie_id, title, fields):
+        """Index a new movie, or re-index one whose title, description or genres changed."""
+        weights = self._weights(fields)
+        with self._lock:
+            self._remove(movie_id)
+            for term, weight in weights.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    insort(self._terms, term)
+                postings[movie_id] = weight
+            self._documents[movie_id] = (title, tuple(weights))
+
+    def remove(self, movie_id):
+        with self._lock:
+            self._remove(movie_id)
+
+    def search(self, query, limit):
+        """Return up to limit (movie_id, title, score) tuples, best match first."""
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            scores = None
+            for word in words:
+                word_scores = {}
+                for term in self._expand(word):
+                    factor = 1.0 if term == word else PREFIX_FACTOR
+                    for movie_id, weight in self._postings[term].items():
+                        if weight * factor > word_scores.get(movie_id, 0):
+                            word_scores[movie_id] = weight * factor
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {m: scores[m] + s for m, s in word_scores.items() if m in scores}
+                if not scores:
+                    return []
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [(movie_id, self._documents[movie_id][0], round(score, 3)) for movie_id, score in best]
+
+    def _weights(self, fields):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS:
+            for term in set(tokenize(fields.get(field))):
+                weights[term] = weights.get(term, 0) + weight
+        return weights
+
+    def _remove(self, movie_id):
+        document = self._documents.pop(movie_id, None)
+        if document is None:
+            return
+        for term in document[1]:
+            postings = self._postings[term]
+            del postings[movie_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def _expand(self, word):
+        """The exact term for word, if any, followed by at most max_prefix_terms terms it prefixes."""
+        terms = [word] if word in self._postings else []
+        i = bisect_left(self._terms, word)
+        while i < len(self._terms) and len(terms) <= self.max_prefix_terms and self._terms[i].startswith(word):
+            if self._terms[i] != word:
+                terms.append(self._terms[i])
+            i += 1
+        return terms
@@ -0,0 +1,51 @@
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+# The service is a flat set of modules run from its own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+from app import app as flask_app, db, CATALOG_CACHE, SEARCH_INDEX  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.create_all()
+        CATALOG_CACHE.clear()
+        SEARCH_INDEX.loaded = False
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(app):
+    return {'Authorization': 'Bearer ' + create_access_token(identity='1', additional_claims={'role': 'ADMIN'})}
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager yielding a list that collects every SQL statement run inside it."""
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return counting
@@ -0,0 +1,32 @@
+import time
+
+import pytest
+
+from layout import build_layout, decode_bitset
+
+
+def test_layout_with_gaps():
+    layout, seat_count = build_layout(['A', 'B'], 3, [['B', 2]])
+    assert layout['rows'] == ['A', 'B'] and seat_count == 5
+    assert decode_bitset(layout['gaps'], 6) == {4}
+
+
+def test_oversized_layout_is_rejected_before_labels_are_built():
+    started = time.monotonic()
+    with pytest.raises(ValueError, match='at most 1000 seats'):
+        build_layout(100000000, 1, max_seats=1000)
+    assert time.monotonic() - started < 0.1
+
+
+@pytest.mark.parametrize('rows, seats_per_row', [(0, 5), ([], 5), ('AB', 5), (3, 0), (3, '5')])
+def test_invalid_layout(rows, seats_per_row):
+    with pytest.raises(ValueError):
+        build_layout(rows, seats_per_row)
+
+
+def test_theater_needs_seat_count_or_layout(client, admin_headers):
+    assert client.post('/theaters', json={'name': 'T'}, headers=admin_headers).status_code == 400
+    assert client.post('/theaters', json={'name': 'T', 'total_seats': 'many'}, headers=admin_headers).status_code == 400
+    assert client.post('/theaters', json={'name': 'T', 'total_seats': 40}, headers=admin_headers).status_code == 201
+    resp = client.post('/theaters', json={'name': 'T', 'rows': 2, 'seats_per_row': 3}, headers=admin_headers)
+    assert resp.status_code == 201
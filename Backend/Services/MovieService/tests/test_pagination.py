@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+from models import db, Showtime, Movie, Theater
+from pagination import InvalidQuery, decode_cursor, encode_cursor, paginate
+
+
+def test_cursor_round_trip():
+    values = [datetime(2026, 1, 1, 18, 30), 42]
+    assert decode_cursor(encode_cursor(values), [Showtime.start_time, Showtime.showtime_id]) == values
+
+
+@pytest.mark.parametrize('token', ['not-base64!', encode_cursor([1]), encode_cursor(['x', 'y', 'z'])])
+def test_bad_cursor(token):
+    with pytest.raises(InvalidQuery):
+        decode_cursor(token, [Showtime.start_time, Showtime.showtime_id])
+
+
+def test_walk_visits_every_row_once_with_ties(app):
+    movie, theater = Movie(title='M'), Theater(name='T', total_seats=1)
+    db.session.add_all([movie, theater])
+    db.session.flush()
+    # Many showtimes share a start time, so the unique tiebreaker decides the order
+    db.session.add_all(
+        Showtime(movie_id=movie.movie_id, theater_id=theater.theater_id, start_time=datetime(2026, 1, 1 + i % 3), price=1)
+        for i in range(25)
+    )
+    db.session.commit()
+
+    order_by = [Showtime.start_time, Showtime.showtime_id]
+    seen, cursor = [], None
+    while True:
+        page, cursor = paginate(Showtime.query, order_by, cursor, 4)
+        seen.extend((s.start_time, s.showtime_id) for s in page)
+        if cursor is None:
+            break
+    assert seen == sorted(seen) and len(set(seen)) == 25
+
+
+def test_accept_filters_and_scan_limit_returns_short_page(app):
+    movie, theater = Movie(title='M'), Theater(name='T', total_seats=1)
+    db.session.add_all([movie, theater])
+    db.session.flush()
+    db.session.add_all(
+        Showtime(movie_id=movie.movie_id, theater_id=theater.theater_id, start_time=datetime(2026, 1, 1, i), price=1)
+        for i in range(20)
+    )
+    db.session.commit()
+    order_by = [Showtime.start_time, Showtime.showtime_id]
+    only_last = lambda rows: [r for r in rows if r.start_time.hour == 19]
+
+    page, cursor = paginate(Showtime.query, order_by, None, 5, accept=only_last, scan_limit=10)
+    assert page == [] and cursor is not None
+    page, cursor = paginate(Showtime.query, order_by, cursor, 5, accept=only_last, scan_limit=10)
+    assert [s.start_time.hour for s in page] == [19] and cursor is None
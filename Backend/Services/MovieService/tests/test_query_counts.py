@@ -0,0 +1,56 @@
+"""List endpoints must load related rows in a fixed number of queries, however many rows they return."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Genre, Movie, Seat, Showtime, Theater
+
+
+def populate(movies, prefix=''):
+    genres = [Genre(name=f'{prefix}Genre {i}') for i in range(3)]
+    theaters = [Theater(name=f'{prefix}Theater {i}', total_seats=2) for i in range(2)]
+    db.session.add_all(genres + theaters)
+    db.session.flush()
+    for theater in theaters:
+        db.session.add_all(Seat(theater_id=theater.theater_id, row_label='A', seat_number=n) for n in (1, 2))
+    start = datetime(2026, 1, 1, 10)
+    for i in range(movies):
+        movie = Movie(title=f'{prefix}Movie {i}', genres=genres[:i % 3 + 1])
+        db.session.add(movie)
+        db.session.flush()
+        for j, theater in enumerate(theaters):
+            db.session.add(Showtime(movie_id=movie.movie_id, theater_id=theater.theater_id,
+                                    start_time=start + timedelta(days=i, hours=j * 3), price=10))
+    db.session.commit()
+
+
+def queries_for(client, count_queries, path):
+    with count_queries() as statements:
+        response = client.get(path)
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize('path', [
+    '/movies',
+    '/movies?include=genres',
+    '/showtimes',
+    '/showtimes?include=movie,theater',
+    '/theaters',
+])
+def test_list_query_count_does_not_grow_with_rows(app, client, count_queries, path):
+    populate(3)
+    few = queries_for(client, count_queries, path)
+    populate(30, prefix='More ')
+    many = queries_for(client, count_queries, path)
+    assert many == few
+
+
+def test_movie_list_loads_genres_and_showtimes_in_bounded_queries(app, client, count_queries):
+    populate(20)
+    with count_queries() as statements:
+        body = client.get('/movies?limit=20').get_json()
+    assert len(body['items']) == 20
+    assert all(item['genres'] and len(item['showtimes']) == 2 for item in body['items'])
+    # table versions, movies, genres, showtimes with theaters
+    assert len(statements) <= 4
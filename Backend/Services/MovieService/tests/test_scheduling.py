@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from scheduling import IntervalIndex, parse_recurrence
+
+
+def at(hour, minute=0):
+    return datetime(2026, 3, 2, hour, minute)
+
+
+@pytest.fixture
+def index():
+    index = IntervalIndex()
+    index.add(at(10), at(12), 1)
+    index.add(at(14), at(14, 30), 2)
+    return index
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (at(12), at(14), None),            # exactly between: intervals are half-open
+    (at(9), at(10), None),
+    (at(14, 30), at(16), None),
+    (at(11, 59), at(13), 1),
+    (at(9), at(10, 1), 1),
+    (at(8), at(20), 2),               # covers both; the later one is reported
+    (at(10, 30), at(11), 1),           # inside a longer interval
+    (at(14, 10), at(14, 20), 2),
+])
+def test_overlapping(index, start, end, expected):
+    clash = index.overlapping(start, end)
+    assert (clash[2] if clash else None) == expected
+
+
+def test_long_interval_is_found_from_far_after_its_start():
+    index = IntervalIndex()
+    index.add(at(0), at(23), 7)
+    index.add(at(1), at(1, 30), 8)
+    assert index.overlapping(at(22), at(22, 30))[2] == 7
+
+
+def test_added_slots_have_no_id():
+    index = IntervalIndex()
+    index.add(at(10), at(11))
+    assert index.overlapping(at(10, 30), at(12)) == (at(10), at(11), 0)
+
+
+def test_parse_recurrence_expands_days_and_times():
+    starts = parse_recurrence(
+        {'start_date': '2026-03-02', 'end_date': '2026-03-08', 'times': ['20:00', '18:00'], 'days': ['mon', 'SAT']},
+        max_slots=100
+    )
+    assert starts == [at(18), at(20), at(18) + timedelta(days=5), at(20) + timedelta(days=5)]
+
+
+@pytest.mark.parametrize('data', [
+    {'start_date': '2026-03-02', 'end_date': '2026-03-01', 'times': ['18:00']},
+    {'start_date': '2026-03-02', 'end_date': '2026-03-08', 'times': []},
+    {'start_date': '2026-03-02', 'end_date': '2026-03-08', 'times': ['18:00'], 'days': ['XYZ']},
+    {'start_date': '2026-03-02', 'end_date': '2026-12-31', 'times': ['18:00']},
+])
+def test_parse_recurrence_rejects(data):
+    with pytest.raises(ValueError):
+        parse_recurrence(data, max_slots=100)
+
+
+@pytest.mark.parametrize('days', [[], ['MON']])
+def test_parse_recurrence_rejects_rules_without_showtimes(days):
+    with pytest.raises(ValueError):
+        # 2026-03-03..05 is Tuesday to Thursday
+        parse_recurrence({'start_date': '2026-03-03', 'end_date': '2026-03-05', 'times': ['18:00'], 'days': days}, 100)
+
+
+def test_schedule_without_showtimes_is_a_bad_request(client, admin_headers):
+    client.post('/theaters', json={'name': 'T', 'rows': 1, 'seats_per_row': 2}, headers=admin_headers)
+    client.post('/movies', json={'title': 'M'}, headers=admin_headers)
+    response = client.post('/showtimes/schedule', json={
+        'movie_id': 1, 'theater_id': 1, 'price': 5,
+        'start_date': '2026-03-03', 'end_date': '2026-03-05', 'times': ['18:00'], 'days': ['MON']
+    }, headers=admin_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('start_time', ['2026-01-01T10:00:00Z', '2026-01-01T10:00:00+02:00', 12])
+def test_showtime_with_offset_is_a_bad_request(client, admin_headers, start_time):
+    client.post('/theaters', json={'name': 'T', 'rows': 1, 'seats_per_row': 2}, headers=admin_headers)
+    client.post('/movies', json={'title': 'M'}, headers=admin_headers)
+    response = client.post('/showtimes', json={
+        'movie_id': 1, 'theater_id': 1, 'start_time': start_time, 'price': 5
+    }, headers=admin_headers)
+    assert response.status_code == 400
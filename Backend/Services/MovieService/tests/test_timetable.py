@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import availability
+from models import db, Movie, Showtime, Theater, TimetableEntry
+
+
+class FakeResponse:
+    def __init__(self, counts):
+        self.counts = counts
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'booked_counts': self.counts}
+
+
+def test_timetable_fetches_booked_counts_in_batches(app, client, monkeypatch):
+    theater, movie = Theater(name='T', total_seats=100), Movie(title='M')
+    db.session.add_all([theater, movie])
+    db.session.flush()
+    start = datetime(2026, 5, 1)
+    showtimes = [
+        Showtime(movie_id=movie.movie_id, theater_id=theater.theater_id, start_time=start + timedelta(minutes=i), price=5)
+        for i in range(1200)
+    ]
+    db.session.add_all(showtimes)
+    db.session.flush()
+    db.session.add_all(
+        TimetableEntry(showtime_id=s.showtime_id, show_date=start.date(), theater_id=theater.theater_id, theater_name='T',
+                       total_seats=100, movie_id=movie.movie_id, movie_title='M', start_time=s.start_time, price=5)
+        for s in showtimes
+    )
+    db.session.commit()
+
+    calls = []
+
+    def fake_get(url, params, timeout):
+        ids = params['showtime_ids'].split(',')
+        calls.append(len(ids))
+        return FakeResponse({i: 1 for i in ids})
+    monkeypatch.setattr(availability.SESSION, 'get', fake_get)
+
+    body = client.get('/timetable?date=2026-05-01').get_json()
+    entries = body['theaters'][0]['showtimes']
+    assert calls == [500, 500, 200]
+    assert len(entries) == 1200 and all(e['remaining_seats'] == 99 for e in entries)
+
+
+def test_remaining_seats_never_go_negative(app, client, monkeypatch):
+    theater, movie = Theater(name='T', total_seats=2), Movie(title='M')
+    db.session.add_all([theater, movie])
+    db.session.flush()
+    showtime = Showtime(movie_id=movie.movie_id, theater_id=theater.theater_id, start_time=datetime(2026, 5, 1, 20), price=5)
+    db.session.add(showtime)
+    db.session.flush()
+    db.session.add(TimetableEntry(showtime_id=showtime.showtime_id, show_date=showtime.start_time.date(),
+                                  theater_id=theater.theater_id, theater_name='T', total_seats=2, movie_id=movie.movie_id,
+                                  movie_title='M', start_time=showtime.start_time, price=5))
+    db.session.commit()
+    # More bookings than seats, as left behind by seats booked outside the theater
+    monkeypatch.setattr(availability.SESSION, 'get', lambda url, params, timeout: FakeResponse({str(showtime.showtime_id): 5}))
+
+    entry = client.get('/timetable?date=2026-05-01').get_json()['theaters'][0]['showtimes'][0]
+    assert entry['remaining_seats'] == 0
+    assert len(client.get('/showtimes?min_available=0').get_json()['items']) == 1
+    assert client.get('/showtimes?min_available=1').get_json()['items'] == []
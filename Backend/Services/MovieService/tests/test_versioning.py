@@ -0,0 +1,6 @@
+def test_etag_revalidates_strong_and_weak(client):
+    etag = client.get('/genres').headers['ETag']
+    assert client.get('/genres', headers={'If-None-Match': etag}).status_code == 304
+    # The gateway hands out W/ tags for the copies it compresses
+    assert client.get('/genres', headers={'If-None-Match': 'W/' + etag}).status_code == 304
+    assert client.get('/genres', headers={'If-None-Match': '"other"'}).status_code == 200
@@ -0,0 +1,35 @@
+"""The timetable read model: one denormalized row per showtime, keyed by (show_date, theater_id).
+
+Rows are rewritten from showtimes, movies and theaters by refresh_timetable in
+the same transaction as the write that changed them. Deleted showtimes take
+their rows with them through the foreign key's ON DELETE CASCADE.
+"""
+from sqlalchemy import delete, func, insert, select
+
+from models import Movie, Showtime, Theater, TimetableEntry
+
+COLUMNS = ('showtime_id', 'show_date', 'theater_id', 'theater_name', 'total_seats',
+           'movie_id', 'movie_title', 'start_time', 'price')
+
+
+def refresh_timetable(connection, showtime_ids):
+    """Rewrite the timetable rows of showtime_ids, a list of IDs or a select of them."""
+    connection.execute(delete(TimetableEntry).where(TimetableEntry.showtime_id.in_(showtime_ids)))
+    rows = (
+        select(Showtime.showtime_id, func.date(Showtime.start_time), Showtime.theater_id, Theater.name,
+               Theater.total_seats, Showtime.movie_id, Movie.title, Showtime.start_time, Showtime.price)
+        .join(Movie, Movie.movie_id == Showtime.movie_id)
+        .join(Theater, Theater.theater_id == Showtime.theater_id)
+        .where(Showtime.showtime_id.in_(showtime_ids))
+    )
+    connection.execute(insert(TimetableEntry).from_select(COLUMNS, rows))
+
+
+def day_timetable(session, day, theater_id=None):
+    """Timetable rows of one day, ordered by theater and start time, in one index range scan."""
+    query = select(TimetableEntry).where(TimetableEntry.show_date == day)
+    if theater_id is not None:
+        query = query.where(TimetableEntry.theater_id == theater_id)
+    return session.execute(
+        query.order_by(TimetableEntry.theater_id, TimetableEntry.start_time)
+    ).scalars().all()
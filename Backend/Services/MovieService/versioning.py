@@ -0,0 +1,90 @@
+import hashlib
+from functools import wraps
+
+from flask import request, make_response, current_app
+from sqlalchemy import event, update, select
+
+from models import TableVersion
+
+# Catalog tables whose writes change what the GET endpoints return
+TRACKED_TABLES = ('genres', 'movies', 'theaters', 'seats', 'showtimes')
+
+
+def bump_versions(connection, tables):
+    """Increment the version of each table, creating its row the first time it is written."""
+    tables = sorted(set(tables))
+    if not tables:
+        return
+    result = connection.execute(
+        update(TableVersion.__table__)
+        .where(TableVersion.table_name.in_(tables))
+        .values(version=TableVersion.version + 1)
+    )
+    if result.rowcount < len(tables):
+        existing = set(connection.execute(
+            select(TableVersion.table_name).where(TableVersion.table_name.in_(tables))
+        ).scalars())
+        missing = [{'table_name': t, 'version': 1} for t in tables if t not in existing]
+        if missing:
+            connection.execute(TableVersion.__table__.insert(), missing)
+
+
+def init_versioning(db):
+    """Bump table versions in the same transaction as every ORM write to a tracked table."""
+    @event.listens_for(db.session, 'after_flush')
+    def bump_flushed_tables(session, flush_context):
+        tables = {
+            obj.__table__.name
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+            if obj.__table__.name in TRACKED_TABLES
+        }
+        bump_versions(session.connection(), tables)
+
+
+def current_versions(session, tables):
+    rows = session.execute(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+    ).all()
+    versions = dict(rows)
+    return [(t, versions.get(t, 0)) for t in sorted(tables)]
+
+
+def conditional(*tables, volatile=(), cache=None):
+    """Tag GET responses with a strong ETag derived from table versions.
+
+    A matching If-None-Match is answered with 304 before the view runs, so the
+    catalog is neither queried nor serialized for clients that are up to date.
+    With a ResponseCache, other clients get the body serialized for the same
+    versions without running the view. Requests using any of the volatile query
+    arguments depend on data outside the tracked tables and are served untagged.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if any(arg in request.args for arg in volatile):
+                return view(*args, **kwargs)
+            db = current_app.extensions['sqlalchemy']
+            versions = current_versions(db.session, tables)
+            digest = hashlib.sha1(f'{versions}|{request.full_path}'.encode()).hexdigest()
+
+            # Weak comparison: the gateway weakens the tag of the copies it compresses
+            if request.if_none_match.contains_weak(digest):
+                response = current_app.response_class(status=304)
+                response.set_etag(digest)
+                return response
+
+            cached = cache.get(request.full_path, digest) if cache is not None else None
+            if cached is not None:
+                body, mimetype = cached
+                response = current_app.response_class(body, mimetype=mimetype)
+                response.set_etag(digest)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(digest)
+                if cache is not None:
+                    cache.put(request.full_path, digest, response.get_data(), response.mimetype)
+            return response
+        return wrapper
+    return decorator
@@ -1,10 +1,18 @@
+import threading
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity, get_jwt
+from datetime import datetime
+from sqlalchemy import func
 import requests
 from config import Config
 from models import db, Reservation, ReservationSeat
+from bitset import encode_bitset
+from booking import SeatsBusy, SeatsTaken, parse_id, parse_seat_ids
+from occupancy import OccupancyCache
+from theater_seats import TheaterSeatsCache, ShowtimeNotFound, SeatsUnavailable
+from holds import HoldExpired, HoldNotFound, book_unheld_seats, place_hold, confirm_hold, release_hold, run_hold_sweeper
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -14,7 +22,37 @@ db.init_app(app)
 migrate = Migrate(app, db)
 jwt = JWTManager(app)
 
-MOVIE_SERVICE_URL = 'http://localhost:5003'
+MOVIE_SERVICE_URL = app.config['MOVIE_SERVICE_URL']
+
+# Seat IDs of each showtime's theater; a booking may only name seats that exist there
+THEATER_SEATS = TheaterSeatsCache(
+    MOVIE_SERVICE_URL, app.config['MOVIE_SERVICE_TIMEOUT'], app.config['THEATER_SEATS_CACHE_SIZE'], app.config['THEATER_SEATS_TTL']
+)
+
+# Booked seats of recently read showtimes, so availability polling rarely reaches the database
+OCCUPANCY = OccupancyCache(
+    app.config['OCCUPANCY_CACHE_SIZE'], app.config['OCCUPANCY_REFRESH_INTERVAL'], app.config['OCCUPANCY_MAX_SPAN']
+)
+
+if app.config['HOLD_SWEEP_INTERVAL'] > 0:
+    threading.Thread(
+        target=run_hold_sweeper,
+        args=(app, db, app.config['HOLD_SWEEP_INTERVAL'], app.config['HOLD_SWEEP_BATCH_SIZE'], OCCUPANCY),
+        daemon=True
+    ).start()
+
+
+def check_theater_seats(showtime_id, seat_ids):
+    """Error response when seat_ids are not all seats of the showtime's theater, else None."""
+    try:
+        invalid = THEATER_SEATS.get(showtime_id).outside(seat_ids)
+    except ShowtimeNotFound:
+        return jsonify({'message': 'Showtime not found'}), 404
+    except SeatsUnavailable:
+        return jsonify({'message': 'Seat layout unavailable, please try again'}), 503
+    if invalid:
+        return jsonify({'message': 'Seats do not exist in this theater', 'invalid_seat_ids': invalid}), 400
+    return None
 
 
 # ==================== USER ENDPOINTS ====================
@@ -23,7 +61,8 @@ MOVIE_SERVICE_URL = 'http://localhost:5003'
 @jwt_required()
 def get_my_reservations():
     user_id = get_jwt_identity()
-    reservations = Reservation.query.filter_by(user_id=user_id).all()
+    # Holds are not reservations yet; they are shown only by the hold endpoints
+    reservations = Reservation.query.filter(Reservation.user_id == user_id, Reservation.status != 'HELD').all()
 
     result = []
     for r in reservations:
@@ -43,40 +82,77 @@ def create_reservation():
     data = request.get_json()
 
     showtime_id = data.get('showtime_id')
-    seat_ids = data.get('seat_ids', [])
-
-    if not showtime_id or not seat_ids:
+    if not showtime_id or not data.get('seat_ids'):
         return jsonify({'message': 'Showtime and seats are required'}), 400
+    try:
+        showtime_id = parse_id(showtime_id, 'showtime_id')
+        seat_ids = parse_seat_ids(data['seat_ids'])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    error = check_theater_seats(showtime_id, seat_ids)
+    if error:
+        return error
 
-    # Check if seats are already booked for this showtime
-    existing = ReservationSeat.query.filter(
-        ReservationSeat.showtime_id == showtime_id,
-        ReservationSeat.seat_id.in_(seat_ids)
-    ).all()
+    try:
+        reservation_id = book_unheld_seats(db.session, user_id, showtime_id, seat_ids, occupancy=OCCUPANCY)
+    except SeatsTaken as e:
+        return jsonify({'message': 'Seats already booked', 'booked_seat_ids': e.seat_ids}), 409
+    except SeatsBusy:
+        return jsonify({'message': 'Seats are being booked by someone else, please try again'}), 409
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify({'message': 'Reservation successful', 'reservation_id': reservation_id}), 201
 
-    if existing:
-        booked = [e.seat_id for e in existing]
-        return jsonify({'message': 'Seats already booked', 'booked_seat_ids': booked}), 409
+@app.route('/reservations/holds', methods=['POST'])
+@jwt_required()
+def create_hold():
+    """Hold seats for HOLD_TTL_SECONDS while the user checks out; confirm the hold to book them."""
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
 
+    showtime_id = data.get('showtime_id')
+    if not showtime_id or not data.get('seat_ids'):
+        return jsonify({'message': 'Showtime and seats are required'}), 400
     try:
-        reservation = Reservation(user_id=user_id, showtime_id=showtime_id)
-        db.session.add(reservation)
-        db.session.flush()
+        showtime_id = parse_id(showtime_id, 'showtime_id')
+        seat_ids = parse_seat_ids(data['seat_ids'])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    error = check_theater_seats(showtime_id, seat_ids)
+    if error:
+        return error
+    if len(seat_ids) > app.config['HOLD_MAX_SEATS']:
+        return jsonify({'message': f"At most {app.config['HOLD_MAX_SEATS']} seats may be held at once"}), 400
 
-        for seat_id in seat_ids:
-            rs = ReservationSeat(
-                reservation_id=reservation.reservation_id,
-                seat_id=seat_id,
-                showtime_id=showtime_id
-            )
-            db.session.add(rs)
+    try:
+        hold_id, expires_at = place_hold(db.session, user_id, showtime_id, seat_ids, app.config['HOLD_TTL_SECONDS'], OCCUPANCY)
+    except SeatsTaken as e:
+        return jsonify({'message': 'Seats already booked', 'booked_seat_ids': e.seat_ids}), 409
+    except SeatsBusy:
+        return jsonify({'message': 'Seats are being booked by someone else, please try again'}), 409
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify({'message': 'Seats held', 'hold_id': hold_id, 'expires_at': expires_at.isoformat()}), 201
 
-        db.session.commit()
-        return jsonify({'message': 'Reservation successful', 'reservation_id': reservation.reservation_id}), 201
+@app.route('/reservations/holds/<int:hold_id>/confirm', methods=['POST'])
+@jwt_required()
+def confirm_seat_hold(hold_id):
+    try:
+        confirm_hold(db.session, hold_id, int(get_jwt_identity()))
+    except HoldNotFound:
+        return jsonify({'message': 'Hold not found'}), 404
+    except HoldExpired:
+        return jsonify({'message': 'Hold expired'}), 410
+    return jsonify({'message': 'Reservation successful', 'reservation_id': hold_id}), 201
 
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'message': f'Booking failed: {str(e)}'}), 500
+@app.route('/reservations/holds/<int:hold_id>', methods=['DELETE'])
+@jwt_required()
+def release_seat_hold(hold_id):
+    try:
+        release_hold(db.session, hold_id, int(get_jwt_identity()), OCCUPANCY)
+    except HoldNotFound:
+        return jsonify({'message': 'Hold not found'}), 404
+    return jsonify({'message': 'Hold released'}), 200
 
 @app.route('/reservations/<int:reservation_id>/cancel', methods=['POST'])
 @jwt_required()
@@ -94,15 +170,60 @@ def cancel_reservation(reservation_id):
 
     reservation.status = 'CANCELLED'
     # Remove seat bookings so others can book them
+    seat_ids = [rs.seat_id for rs in reservation.reservation_seats]
     ReservationSeat.query.filter_by(reservation_id=reservation_id).delete()
     db.session.commit()
+    OCCUPANCY.released(reservation.showtime_id, seat_ids)
     return jsonify({'message': 'Reservation cancelled'}), 200
 
 @app.route('/reservations/showtime/<int:showtime_id>/booked-seats', methods=['GET'])
 def get_booked_seats(showtime_id):
-    """Public: get list of booked seat IDs for a showtime."""
-    booked = ReservationSeat.query.filter_by(showtime_id=showtime_id).all()
-    return jsonify({'booked_seat_ids': [b.seat_id for b in booked]}), 200
+    """Public: get booked seat IDs for a showtime, as a list or (format=bitmap) as a bitset.
+
+    In the bitset, bit k is set when seat base + k is booked. base and size default to
+    the range of booked IDs (at most MAX_BITMAP_SIZE, later IDs are left out); pass the
+    layout's first seat ID and seat count to align the bitset with a theater's seats.
+    """
+    seat_format = request.args.get('format', 'list')
+    if seat_format not in ('list', 'bitmap'):
+        return jsonify({'message': 'format must be list or bitmap'}), 400
+    seat_ids = OCCUPANCY.bitmap(db.session, showtime_id).seat_ids()
+    if seat_format == 'list':
+        return jsonify({'booked_seat_ids': seat_ids}), 200
+
+    try:
+        base = int(request.args.get('base', min(seat_ids, default=0)))
+        # By default the bitset runs up to the highest booked ID, cut off at MAX_BITMAP_SIZE seats
+        default_size = min(max(max(seat_ids, default=base - 1) - base + 1, 0), app.config['MAX_BITMAP_SIZE'])
+        size = int(request.args.get('size', default_size))
+    except ValueError:
+        return jsonify({'message': 'base and size must be integers'}), 400
+    if size < 0 or size > app.config['MAX_BITMAP_SIZE']:
+        return jsonify({'message': f"size must be between 0 and {app.config['MAX_BITMAP_SIZE']}"}), 400
+    return jsonify({
+        'base': base,
+        'size': size,
+        'booked': encode_bitset([seat_id - base for seat_id in seat_ids], size)
+    }), 200
+
+@app.route('/reservations/booked-counts', methods=['GET'])
+def get_booked_counts():
+    """Public: number of booked seats per showtime for a comma-separated list of showtime IDs."""
+    try:
+        showtime_ids = [int(i) for i in request.args.get('showtime_ids', '').split(',') if i]
+    except ValueError:
+        return jsonify({'message': 'showtime_ids must be comma-separated integers'}), 400
+    if len(showtime_ids) > app.config['MAX_BOOKED_COUNT_IDS']:
+        return jsonify({'message': f"At most {app.config['MAX_BOOKED_COUNT_IDS']} showtime_ids per request"}), 400
+
+    counts = OCCUPANCY.counts(showtime_ids)
+    # Showtimes nobody has looked at recently are counted in the database rather than loaded
+    uncached = [i for i in showtime_ids if i not in counts]
+    if uncached:
+        counts.update(db.session.query(ReservationSeat.showtime_id, func.count()).filter(
+            ReservationSeat.showtime_id.in_(uncached)
+        ).group_by(ReservationSeat.showtime_id).all())
+    return jsonify({'booked_counts': {str(showtime_id): count for showtime_id, count in counts.items() if count}}), 200
 
 
 # ==================== ADMIN ENDPOINTS ====================
@@ -114,7 +235,7 @@ def get_all_reservations():
     if claims.get('role') != 'ADMIN':
         return jsonify({'message': 'Admin access required'}), 403
 
-    reservations = Reservation.query.all()
+    reservations = Reservation.query.filter(Reservation.status != 'HELD').all()
     result = []
     for r in reservations:
         result.append({
@@ -134,16 +255,22 @@ def get_stats():
     if claims.get('role') != 'ADMIN':
         return jsonify({'message': 'Admin access required'}), 403
 
-    total = Reservation.query.count()
+    total = Reservation.query.filter(Reservation.status != 'HELD').count()
     active = Reservation.query.filter_by(status='ACTIVE').count()
     cancelled = Reservation.query.filter_by(status='CANCELLED').count()
-    total_seats_booked = ReservationSeat.query.count()
+    total_seats_booked = ReservationSeat.query.join(Reservation).filter(Reservation.status == 'ACTIVE').count()
+    # Holds are counted apart, leaving out lapsed ones the sweeper has not deleted yet
+    live_hold = (Reservation.status == 'HELD', Reservation.expires_at > datetime.utcnow())
+    active_holds = Reservation.query.filter(*live_hold).count()
+    held_seats = ReservationSeat.query.join(Reservation).filter(*live_hold).count()
 
     return jsonify({
         'total_reservations': total,
         'active_reservations': active,
         'cancelled_reservations': cancelled,
-        'total_seats_booked': total_seats_booked
+        'total_seats_booked': total_seats_booked,
+        'active_holds': active_holds,
+        'held_seats': held_seats
     }), 200
 
 
@@ -0,0 +1,10 @@
+import base64
+
+
+def encode_bitset(positions, size):
+    """Base64 bitset of size bits with the given positions set; position 0 is the high bit of the first byte."""
+    bits = bytearray((size + 7) // 8)
+    for p in positions:
+        if 0 <= p < size:
+            bits[p // 8] |= 0x80 >> (p % 8)
+    return base64.b64encode(bytes(bits)).decode()
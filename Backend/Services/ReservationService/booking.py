@@ -0,0 +1,82 @@
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DataError, IntegrityError, OperationalError
+
+from models import Reservation, ReservationSeat
+
+# Largest value the INT seat_id and showtime_id columns hold
+MAX_ID = 2 ** 31 - 1
+# MySQL errors raised when concurrent inserts lock each other out: deadlock, lock wait timeout
+LOCK_CONFLICT_ERRORS = (1213, 1205)
+
+
+class SeatsTaken(Exception):
+    """Raised when some of the requested seats are already booked for the showtime."""
+
+    def __init__(self, seat_ids):
+        super().__init__(f'Seats already booked: {seat_ids}')
+        self.seat_ids = seat_ids
+
+
+class SeatsBusy(Exception):
+    """Raised when concurrent bookings of the same seats kept the insert from getting its locks."""
+
+
+def parse_id(value, name):
+    """A positive integer ID that fits the INT columns; raise ValueError otherwise."""
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 < value <= MAX_ID:
+        raise ValueError(f'{name} must be an integer between 1 and {MAX_ID}')
+    return value
+
+
+def parse_seat_ids(value):
+    """Distinct seat IDs from a JSON list of integers, in ascending order; raise ValueError otherwise."""
+    if not isinstance(value, list) or not value:
+        raise ValueError('seat_ids must be a non-empty list of integers')
+    # Ascending order makes every insert take its row locks in the same order, so two overlapping bookings cannot deadlock
+    return sorted({parse_id(seat_id, 'seat_ids') for seat_id in value})
+
+
+def book_seats(session, user_id, showtime_id, seat_ids, status='ACTIVE', expires_at=None, occupancy=None):
+    """Create a reservation (or, with status HELD, a hold) for seat_ids and commit it; return its ID.
+
+    No conflict check is made beforehand: all seats go in with one multi-row
+    INSERT and the unique_seat_booking_per_showtime constraint decides, so
+    concurrent bookings of the same seat cannot both succeed and locks are held
+    only for the length of the insert. An insert that loses a lock race is
+    retried once before SeatsBusy is raised.
+    """
+    for attempt in range(2):
+        try:
+            reservation_id = _insert(session, user_id, showtime_id, seat_ids, status, expires_at)
+            break
+        except IntegrityError:
+            session.rollback()
+            taken = session.execute(
+                select(ReservationSeat.seat_id)
+                .where(ReservationSeat.showtime_id == showtime_id, ReservationSeat.seat_id.in_(seat_ids))
+            ).scalars().all()
+            # A competing booking may have been cancelled in between; report what was asked for then
+            raise SeatsTaken(sorted(taken) or seat_ids)
+        except DataError as e:
+            session.rollback()
+            raise ValueError('showtime_id and seat_ids must fit the database columns') from e
+        except OperationalError as e:
+            session.rollback()
+            if (getattr(e.orig, 'args', None) or (None,))[0] not in LOCK_CONFLICT_ERRORS:
+                raise
+            if attempt:
+                raise SeatsBusy() from e
+    if occupancy is not None:
+        occupancy.booked(showtime_id, seat_ids)
+    return reservation_id
+
+
+def _insert(session, user_id, showtime_id, seat_ids, status, expires_at):
+    reservation_id = session.execute(
+        insert(Reservation).values(user_id=user_id, showtime_id=showtime_id, status=status, expires_at=expires_at)
+    ).inserted_primary_key[0]
+    session.execute(insert(ReservationSeat).values([
+        {'reservation_id': reservation_id, 'seat_id': seat_id, 'showtime_id': showtime_id} for seat_id in seat_ids
+    ]))
+    session.commit()
+    return reservation_id
@@ -8,3 +8,28 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'mysql+pymysql://root:@localhost/reservation_db')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev_jwt_secret_key')
+
+    # MovieService, asked for each showtime's seat IDs so bookings can be checked against the theater
+    MOVIE_SERVICE_URL = os.getenv('MOVIE_SERVICE_URL', 'http://localhost:5003')
+    MOVIE_SERVICE_TIMEOUT = float(os.getenv('MOVIE_SERVICE_TIMEOUT', '2'))
+    THEATER_SEATS_CACHE_SIZE = int(os.getenv('THEATER_SEATS_CACHE_SIZE', '5000'))
+    THEATER_SEATS_TTL = float(os.getenv('THEATER_SEATS_TTL', '300'))
+
+    # Upper bound on showtimes per /reservations/booked-counts call
+    MAX_BOOKED_COUNT_IDS = int(os.getenv('MAX_BOOKED_COUNT_IDS', '500'))
+    # Largest seat bitset /booked-seats?format=bitmap will build
+    MAX_BITMAP_SIZE = int(os.getenv('MAX_BITMAP_SIZE', '100000'))
+
+    # Seat holds: how long they last, how many seats one may cover, and how often lapsed ones are deleted
+    HOLD_TTL_SECONDS = int(os.getenv('HOLD_TTL_SECONDS', '300'))
+    HOLD_MAX_SEATS = int(os.getenv('HOLD_MAX_SEATS', '10'))
+    HOLD_SWEEP_INTERVAL = float(os.getenv('HOLD_SWEEP_INTERVAL', '10'))
+    HOLD_SWEEP_BATCH_SIZE = int(os.getenv('HOLD_SWEEP_BATCH_SIZE', '500'))
+
+    # Showtimes whose booked seats are kept in memory, and seconds before writes made by other processes
+    # (replicas, gunicorn workers, the hold sweeper of another process) are picked up. 0 never reloads
+    # and is only safe when a single process serves all bookings.
+    OCCUPANCY_CACHE_SIZE = int(os.getenv('OCCUPANCY_CACHE_SIZE', '5000'))
+    OCCUPANCY_REFRESH_INTERVAL = float(os.getenv('OCCUPANCY_REFRESH_INTERVAL', '2'))
+    # Widest range of booked seat IDs one showtime's bitmap may cover; wider showtimes are read from the database
+    OCCUPANCY_MAX_SPAN = int(os.getenv('OCCUPANCY_MAX_SPAN', '10000'))
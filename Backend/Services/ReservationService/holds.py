@@ -0,0 +1,124 @@
+"""Seat holds: HELD reservations that keep seats for one user until they expire or are confirmed.
+
+A hold's seats are ordinary reservation_seats rows, so holds and bookings
+exclude each other through the same unique constraint and confirming a hold
+is a single UPDATE. Lapsed holds are deleted by run_hold_sweeper.
+"""
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+
+from booking import SeatsTaken, book_seats
+from models import Reservation, ReservationSeat
+
+
+class HoldNotFound(Exception):
+    """Raised when a hold does not exist or belongs to another user."""
+
+
+class HoldExpired(Exception):
+    """Raised when a hold lapsed before it was confirmed."""
+
+
+def place_hold(session, user_id, showtime_id, seat_ids, ttl_seconds, occupancy=None):
+    """Hold seat_ids for ttl_seconds; return (hold ID, expiry) or raise SeatsTaken."""
+    expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+    return book_unheld_seats(session, user_id, showtime_id, seat_ids, 'HELD', expires_at, occupancy), expires_at
+
+
+def book_unheld_seats(session, user_id, showtime_id, seat_ids, status='ACTIVE', expires_at=None, occupancy=None):
+    """book_seats, except that holds which lapsed since the last sweep do not count as taking a seat."""
+    try:
+        return book_seats(session, user_id, showtime_id, seat_ids, status, expires_at, occupancy)
+    except SeatsTaken as e:
+        # Drop just the lapsed holds in the way and retry once
+        if not delete_expired_holds(session, showtime_id=showtime_id, seat_ids=e.seat_ids, occupancy=occupancy):
+            raise
+    return book_seats(session, user_id, showtime_id, seat_ids, status, expires_at, occupancy)
+
+
+def confirm_hold(session, hold_id, user_id):
+    """Turn an unexpired hold of user_id into an active reservation."""
+    confirmed = session.execute(
+        update(Reservation)
+        .where(Reservation.reservation_id == hold_id, Reservation.user_id == user_id,
+               Reservation.status == 'HELD', Reservation.expires_at > datetime.utcnow())
+        .values(status='ACTIVE', expires_at=None, reservation_time=datetime.utcnow())
+    ).rowcount
+    session.commit()
+    if confirmed:
+        return
+    hold = session.get(Reservation, hold_id)
+    if hold is None or hold.user_id != user_id or hold.status != 'HELD':
+        raise HoldNotFound()
+    raise HoldExpired()
+
+
+def release_hold(session, hold_id, user_id, occupancy=None):
+    """Give up a hold before it expires."""
+    hold = session.execute(
+        select(Reservation.reservation_id)
+        .where(Reservation.reservation_id == hold_id, Reservation.user_id == user_id, Reservation.status == 'HELD')
+        .with_for_update()
+    ).scalar()
+    if hold is None:
+        session.rollback()
+        raise HoldNotFound()
+    freed = _delete_holds(session, [hold_id])
+    session.commit()
+    _release(occupancy, freed)
+
+
+def delete_expired_holds(session, showtime_id=None, seat_ids=None, limit=None, occupancy=None):
+    """Delete lapsed holds, optionally only those on seat_ids of showtime_id; return how many."""
+    query = select(Reservation.reservation_id).where(
+        Reservation.status == 'HELD', Reservation.expires_at <= datetime.utcnow()
+    )
+    if showtime_id is not None:
+        query = query.where(Reservation.reservation_id.in_(
+            select(ReservationSeat.reservation_id)
+            .where(ReservationSeat.showtime_id == showtime_id, ReservationSeat.seat_id.in_(seat_ids))
+        ))
+    if limit is not None:
+        query = query.limit(limit)
+    hold_ids = session.execute(query).scalars().all()
+    freed = _delete_holds(session, hold_ids) if hold_ids else []
+    session.commit()
+    _release(occupancy, freed)
+    return len(hold_ids)
+
+
+def _delete_holds(session, hold_ids):
+    """Delete holds; return the (showtime_id, seat_id) pairs they held."""
+    freed = session.execute(
+        select(ReservationSeat.showtime_id, ReservationSeat.seat_id).where(ReservationSeat.reservation_id.in_(hold_ids))
+    ).all()
+    session.execute(delete(ReservationSeat).where(ReservationSeat.reservation_id.in_(hold_ids)))
+    session.execute(delete(Reservation).where(Reservation.reservation_id.in_(hold_ids)))
+    return freed
+
+
+def _release(occupancy, freed):
+    if occupancy is None:
+        return
+    by_showtime = {}
+    for showtime_id, seat_id in freed:
+        by_showtime.setdefault(showtime_id, []).append(seat_id)
+    for showtime_id, seat_ids in by_showtime.items():
+        occupancy.released(showtime_id, seat_ids)
+
+
+def run_hold_sweeper(app, db, interval, batch_size, occupancy=None):
+    """Delete lapsed holds forever, batch_size per transaction, so requests never wait on the cleanup."""
+    while True:
+        with app.app_context():
+            try:
+                while delete_expired_holds(db.session, limit=batch_size, occupancy=occupancy) == batch_size:
+                    pass
+            except Exception as e:
+                db.session.rollback()
+                app.logger.warning('Hold sweep failed: %s', e)
+            finally:
+                db.session.remove()
+        time.sleep(interval)
@@ -9,9 +9,13 @@ class Reservation(db.Model):
     user_id = db.Column(db.Integer, nullable=False) # Refers to AuthUser ID
     showtime_id = db.Column(db.Integer, nullable=False) # Refers to Movie Service Showtime ID
     reservation_time = db.Column(db.DateTime, default=datetime.utcnow)
-    status = db.Column(db.Enum('ACTIVE', 'CANCELLED'), default='ACTIVE')
+    # HELD reservations are seat holds that lapse at expires_at unless confirmed
+    status = db.Column(db.Enum('ACTIVE', 'CANCELLED', 'HELD'), default='ACTIVE')
+    expires_at = db.Column(db.DateTime)
     reservation_seats = db.relationship('ReservationSeat', backref='reservation', cascade='all, delete-orphan', lazy=True)
 
+    __table_args__ = (db.Index('ix_reservations_status_expires', 'status', 'expires_at'),)
+
 class ReservationSeat(db.Model):
     __tablename__ = 'reservation_seats'
     reservation_id = db.Column(db.Integer, db.ForeignKey('reservations.reservation_id', ondelete='CASCADE'), primary_key=True)
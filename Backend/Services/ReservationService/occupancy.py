@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from models import ReservationSeat
+
+
+class SeatBitmap:
+    """Booked seat IDs of one showtime as bits of an integer, bit k standing for seat base + k."""
+
+    def __init__(self, seat_ids=()):
+        self.base = min(seat_ids, default=0)
+        self.bits = 0
+        self.count = 0
+        self.add(seat_ids)
+
+    def add(self, seat_ids):
+        for seat_id in seat_ids:
+            if seat_id < self.base:
+                self.bits <<= self.base - seat_id
+                self.base = seat_id
+            bit = 1 << (seat_id - self.base)
+            if not self.bits & bit:
+                self.bits |= bit
+                self.count += 1
+
+    def remove(self, seat_ids):
+        for seat_id in seat_ids:
+            bit = 1 << (seat_id - self.base) if seat_id >= self.base else 0
+            if self.bits & bit:
+                self.bits &= ~bit
+                self.count -= 1
+
+    def copy(self):
+        bitmap = SeatBitmap()
+        bitmap.base, bitmap.bits, bitmap.count = self.base, self.bits, self.count
+        return bitmap
+
+    def span(self, seat_ids=()):
+        """Bits needed to hold the booked seats together with seat_ids."""
+        ids = list(seat_ids)
+        if self.count:
+            ids += [self.base, self.base + self.bits.bit_length() - 1]
+        return max(ids) - min(ids) + 1 if ids else 0
+
+    def seat_ids(self):
+        ids, bits, offset = [], self.bits, self.base
+        while bits:
+            low = bits & -bits
+            ids.append(offset + low.bit_length() - 1)
+            bits ^= low
+        return ids
+
+
+class SeatList:
+    """Booked seat IDs of a showtime whose seats lie too far apart for a SeatBitmap."""
+
+    def __init__(self, seat_ids):
+        self._seat_ids = sorted(seat_ids)
+        self.count = len(self._seat_ids)
+
+    def seat_ids(self):
+        return list(self._seat_ids)
+
+
+class OccupancyCache:
+    """Per-showtime seat bitmaps of the showtimes read most recently, loaded on first use.
+
+    Bookings, cancellations and released holds made by this process update the
+    bitmaps as they commit. refresh_interval bounds how long writes made by other
+    replicas can go unseen; 0 keeps entries until they are evicted. Showtimes
+    whose booked seat IDs span more than max_span are not cached at all, so a
+    stray seat ID cannot make a bitmap grow without bound.
+    """
+
+    def __init__(self, max_showtimes, refresh_interval, max_span):
+        self.max_showtimes = max_showtimes
+        self.refresh_interval = refresh_interval
+        self.max_span = max_span
+        self._bitmaps = OrderedDict()  # showtime_id -> (SeatBitmap, loaded_at)
+        # Bumped by every write; a load that overlapped one is used but not kept
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def bitmap(self, session, showtime_id):
+        """The showtime's SeatBitmap, read from the database only when it is not cached.
+
+        A showtime whose seats do not fit in max_span bits is read as a SeatList every time.
+        """
+        with self._lock:
+            entry = self._bitmaps.get(showtime_id)
+            if entry is not None and not self._stale(entry):
+                self._bitmaps.move_to_end(showtime_id)
+                return entry[0]
+            generation = self._generation
+
+        seat_ids = session.execute(
+            select(ReservationSeat.seat_id).where(ReservationSeat.showtime_id == showtime_id)
+        ).scalars().all()
+        if SeatBitmap().span(seat_ids) > self.max_span:
+            return SeatList(seat_ids)
+        bitmap = SeatBitmap(seat_ids)
+        with self._lock:
+            if generation == self._generation:
+                self._bitmaps[showtime_id] = (bitmap, time.monotonic())
+                self._bitmaps.move_to_end(showtime_id)
+                while len(self._bitmaps) > self.max_showtimes:
+                    self._bitmaps.popitem(last=False)
+        return bitmap
+
+    def counts(self, showtime_ids):
+        """Booked seat counts of the cached showtimes among showtime_ids."""
+        with self._lock:
+            return {
+                showtime_id: entry[0].count for showtime_id in showtime_ids
+                if (entry := self._bitmaps.get(showtime_id)) is not None and not self._stale(entry)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._bitmaps.clear()
+
+    def booked(self, showtime_id, seat_ids):
+        self._update(showtime_id, seat_ids, SeatBitmap.add)
+
+    def released(self, showtime_id, seat_ids):
+        self._update(showtime_id, seat_ids, SeatBitmap.remove)
+
+    def _update(self, showtime_id, seat_ids, change):
+        with self._lock:
+            self._generation += 1
+            entry = self._bitmaps.get(showtime_id)
+            if entry is not None and entry[0].span(seat_ids) > self.max_span:
+                del self._bitmaps[showtime_id]
+            elif entry is not None:
+                # Bitmaps handed out earlier are never mutated, so readers need no lock
+                bitmap = entry[0].copy()
+                change(bitmap, seat_ids)
+                self._bitmaps[showtime_id] = (bitmap, entry[1])
+
+    def _stale(self, entry):
+        return self.refresh_interval > 0 and time.monotonic() - entry[1] > self.refresh_interval
@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+# The service is a flat set of modules run from its own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['HOLD_SWEEP_INTERVAL'] = '0'
+
+from app import app as flask_app, db, OCCUPANCY, THEATER_SEATS  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+
+class FakeMovieService:
+    """Answers the seat layout requests ReservationService makes; every showtime has seats 1-100 by default."""
+
+    def __init__(self):
+        self.layouts = {}
+        self.down = False
+
+    def get(self, url, params=None, timeout=None):
+        if self.down:
+            raise requests.ConnectionError('MovieService is down')
+        showtime_id = int(url.split('/')[-2])
+        layout = self.layouts.get(showtime_id, {'rows': ['A'], 'seats_per_row': 100, 'gaps': '', 'first_seat_id': 1})
+        resp = requests.Response()
+        resp.status_code = 404 if layout is None else 200
+        resp._content = json.dumps(layout).encode()
+        return resp
+
+
+@pytest.fixture
+def movie_service(monkeypatch):
+    fake = FakeMovieService()
+    monkeypatch.setattr(THEATER_SEATS._session, 'get', fake.get)
+    return fake
+
+
+@pytest.fixture
+def app(movie_service):
+    with flask_app.app_context():
+        db.create_all()
+        OCCUPANCY.clear()
+        THEATER_SEATS.clear()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user_headers(app):
+    return {'Authorization': 'Bearer ' + create_access_token(identity='7')}
+
+
+@pytest.fixture
+def admin_headers(app):
+    return {'Authorization': 'Bearer ' + create_access_token(identity='1', additional_claims={'role': 'ADMIN'})}
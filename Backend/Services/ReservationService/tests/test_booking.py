@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import booking
+from booking import MAX_ID, parse_seat_ids
+
+
+def test_parse_seat_ids_sorts_and_dedupes():
+    assert parse_seat_ids([5, 3, 5, 1]) == [1, 3, 5]
+
+
+@pytest.mark.parametrize('value', [[], [0], [-1], [MAX_ID + 1], [2 ** 40], ['1'], [True], 3])
+def test_parse_seat_ids_rejects(value):
+    with pytest.raises(ValueError):
+        parse_seat_ids(value)
+
+
+def test_booking_conflict(client, user_headers):
+    r = client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [1, 2, 3]}, headers=user_headers)
+    assert r.status_code == 201
+    r = client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [4, 3, 1]}, headers=user_headers)
+    assert r.status_code == 409 and r.get_json()['booked_seat_ids'] == [1, 3]
+
+
+@pytest.mark.parametrize('body', [
+    {'showtime_id': 1, 'seat_ids': [2 ** 40]},
+    {'showtime_id': 2 ** 31, 'seat_ids': [1]},
+    {'showtime_id': '1', 'seat_ids': [1]},
+])
+def test_out_of_range_ids_are_rejected(client, user_headers, body):
+    assert client.post('/reservations', json=body, headers=user_headers).status_code == 400
+
+
+def deadlock(monkeypatch, times):
+    insert = booking._insert
+    calls = []
+
+    def flaky(*args):
+        calls.append(1)
+        if len(calls) <= times:
+            raise OperationalError('INSERT', {}, Exception(1213, 'Deadlock found when trying to get lock'))
+        return insert(*args)
+    monkeypatch.setattr(booking, '_insert', flaky)
+    return calls
+
+
+def test_deadlock_is_retried(client, user_headers, monkeypatch):
+    calls = deadlock(monkeypatch, 1)
+    r = client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [1]}, headers=user_headers)
+    assert r.status_code == 201 and len(calls) == 2
+
+
+def test_repeated_deadlock_is_a_conflict(client, user_headers, monkeypatch):
+    deadlock(monkeypatch, 2)
+    r = client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [1]}, headers=user_headers)
+    assert r.status_code == 409
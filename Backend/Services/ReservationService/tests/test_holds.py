@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from models import db, Reservation
+
+
+def hold(client, headers, seat_ids):
+    r = client.post('/reservations/holds', json={'showtime_id': 1, 'seat_ids': seat_ids}, headers=headers)
+    assert r.status_code == 201
+    return r.get_json()['hold_id']
+
+
+def expire(hold_id):
+    db.session.get(Reservation, hold_id).expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_booking_takes_seats_of_lapsed_hold(client, user_headers):
+    expire(hold(client, user_headers, [1, 2]))
+    r = client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [2, 3]}, headers=user_headers)
+    assert r.status_code == 201
+
+
+def test_booking_does_not_take_seats_of_live_hold(client, user_headers):
+    hold(client, user_headers, [1, 2])
+    r = client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [2, 3]}, headers=user_headers)
+    assert r.status_code == 409 and r.get_json()['booked_seat_ids'] == [2]
+
+
+def test_holds_are_kept_out_of_listings_and_stats(client, user_headers, admin_headers):
+    expire(hold(client, user_headers, [1]))
+    hold(client, user_headers, [2, 3])
+    client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [4]}, headers=user_headers)
+
+    assert [r['seats'] for r in client.get('/reservations', headers=user_headers).get_json()] == [[4]]
+    assert [r['seats'] for r in client.get('/reservations/all', headers=admin_headers).get_json()] == [[4]]
+    stats = client.get('/reservations/stats', headers=admin_headers).get_json()
+    assert stats['total_reservations'] == 1 and stats['total_seats_booked'] == 1
+    assert stats['active_holds'] == 1 and stats['held_seats'] == 2
@@ -0,0 +1,106 @@
+import pytest
+
+from app import OCCUPANCY
+from booking import MAX_ID
+from models import db
+from occupancy import OccupancyCache, SeatBitmap, SeatList
+
+
+def test_seat_bitmap_add_remove():
+    bitmap = SeatBitmap([105, 101, 103])
+    assert (bitmap.base, bitmap.count, bitmap.seat_ids()) == (101, 3, [101, 103, 105])
+    bitmap.add([99, 103])
+    assert (bitmap.base, bitmap.count, bitmap.seat_ids()) == (99, 4, [99, 101, 103, 105])
+    bitmap.remove([101, 50, 500])
+    assert (bitmap.count, bitmap.seat_ids()) == (3, [99, 103, 105])
+
+
+def test_seat_bitmap_copy_is_independent():
+    bitmap = SeatBitmap([1, 2])
+    copy = bitmap.copy()
+    copy.add([3])
+    assert bitmap.seat_ids() == [1, 2] and copy.seat_ids() == [1, 2, 3]
+
+
+@pytest.mark.parametrize('seat_ids, extra, expected', [
+    ([], [], 0),
+    ([], [7], 1),
+    ([10, 12], [], 3),
+    ([10, 12], [5], 8),
+    ([10, 12], [20], 11),
+])
+def test_seat_bitmap_span(seat_ids, extra, expected):
+    assert SeatBitmap(seat_ids).span(extra) == expected
+
+
+def booked_seats(client, showtime_id):
+    return client.get(f'/reservations/showtime/{showtime_id}/booked-seats').get_json()['booked_seat_ids']
+
+
+def test_cache_follows_bookings_and_cancellations(client, user_headers):
+    assert booked_seats(client, 1) == []
+    r = client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [3, 1]}, headers=user_headers)
+    assert booked_seats(client, 1) == [1, 3]
+    client.post(f"/reservations/{r.get_json()['reservation_id']}/cancel", headers=user_headers)
+    assert booked_seats(client, 1) == []
+    assert OCCUPANCY.counts([1]) == {1: 0}
+
+
+def test_far_apart_seats_are_not_cached(client, user_headers):
+    client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [1]}, headers=user_headers)
+    assert booked_seats(client, 1) == [1]
+    assert OCCUPANCY.counts([1]) == {1: 1}
+
+    # A write that would stretch the bitmap past max_span (such as a stray seat booked before
+    # bookings were checked against the theater) drops the showtime from the cache
+    OCCUPANCY.booked(1, [MAX_ID])
+    db.session.execute(db.text(
+        f'INSERT INTO reservation_seats (reservation_id, seat_id, showtime_id) VALUES (99, {MAX_ID}, 1)'
+    ))
+    db.session.commit()
+    assert OCCUPANCY.counts([1]) == {}
+    assert booked_seats(client, 1) == [1, MAX_ID]
+    assert OCCUPANCY.counts([1]) == {}
+    r = client.get('/reservations/booked-counts?showtime_ids=1')
+    assert r.get_json() == {'booked_counts': {'1': 2}}
+
+
+def test_wide_showtime_is_read_as_list(app):
+    cache = OccupancyCache(10, 0, max_span=100)
+    db.session.execute(db.text(
+        'INSERT INTO reservation_seats (reservation_id, seat_id, showtime_id) VALUES (1, 5, 9), (1, 500, 9)'
+    ))
+    seats = cache.bitmap(db.session, 9)
+    assert isinstance(seats, SeatList) and seats.seat_ids() == [5, 500] and seats.count == 2
+    assert cache.counts([9]) == {}
+
+
+def test_default_bitmap_window_leaves_out_stray_seats(client, user_headers, app):
+    client.post('/reservations', json={'showtime_id': 1, 'seat_ids': [3, 5]}, headers=user_headers)
+    db.session.execute(db.text(
+        f'INSERT INTO reservation_seats (reservation_id, seat_id, showtime_id) VALUES (99, {MAX_ID}, 1)'
+    ))
+    db.session.commit()
+    OCCUPANCY.clear()
+
+    resp = client.get('/reservations/showtime/1/booked-seats?format=bitmap')
+    assert resp.status_code == 200
+    assert resp.get_json()['base'] == 3 and resp.get_json()['size'] == app.config['MAX_BITMAP_SIZE']
+    resp = client.get('/reservations/showtime/1/booked-seats?format=bitmap&base=1&size=8')
+    assert resp.get_json() == {'base': 1, 'size': 8, 'booked': 'KA=='}
+
+
+def test_writes_of_other_processes_show_up_after_refresh_interval(app, monkeypatch):
+    assert app.config['OCCUPANCY_REFRESH_INTERVAL'] > 0
+    clock = [1000.0]
+    monkeypatch.setattr('occupancy.time.monotonic', lambda: clock[0])
+    cache = OccupancyCache(10, app.config['OCCUPANCY_REFRESH_INTERVAL'], max_span=100)
+    assert cache.bitmap(db.session, 1).seat_ids() == []
+
+    # Booked through another process, so this cache is not told about it
+    db.session.execute(db.text('INSERT INTO reservation_seats (reservation_id, seat_id, showtime_id) VALUES (1, 4, 1)'))
+    db.session.commit()
+    assert cache.bitmap(db.session, 1).seat_ids() == []
+    clock[0] += app.config['OCCUPANCY_REFRESH_INTERVAL'] + 0.1
+    assert cache.counts([1]) == {}
+    assert cache.bitmap(db.session, 1).seat_ids() == [4]
@@ -0,0 +1,35 @@
+import pytest
+
+from theater_seats import TheaterSeats
+
+
+@pytest.mark.parametrize('layout, inside, outside', [
+    # Two rows of three with one gap: five seats, IDs 10-14
+    ({'rows': ['A', 'B'], 'seats_per_row': 3, 'gaps': 'BA==', 'first_seat_id': 10}, [10, 14], [9, 15]),
+    ({'rows': ['A'], 'seats_per_row': 2, 'gaps': '', 'seat_ids': [7, 30]}, [7, 30], [8, 29]),
+])
+def test_theater_seats(layout, inside, outside):
+    seats = TheaterSeats(layout)
+    assert seats.outside(inside + outside) == outside
+
+
+def book(client, headers, showtime_id, seat_ids):
+    return client.post('/reservations', json={'showtime_id': showtime_id, 'seat_ids': seat_ids}, headers=headers)
+
+
+def test_seats_outside_theater_are_rejected(client, user_headers, movie_service):
+    resp = book(client, user_headers, 1, [100, 101, 2147483647])
+    assert resp.status_code == 400 and resp.get_json()['invalid_seat_ids'] == [101, 2147483647]
+    resp = client.post('/reservations/holds', json={'showtime_id': 1, 'seat_ids': [0x7fff]}, headers=user_headers)
+    assert resp.status_code == 400
+    assert client.get('/reservations/showtime/1/booked-seats').get_json() == {'booked_seat_ids': []}
+
+
+def test_unknown_showtime(client, user_headers, movie_service):
+    movie_service.layouts[5] = None
+    assert book(client, user_headers, 5, [1]).status_code == 404
+
+
+def test_movie_service_down(client, user_headers, movie_service):
+    movie_service.down = True
+    assert book(client, user_headers, 1, [1]).status_code == 503
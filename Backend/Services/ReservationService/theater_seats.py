@@ -0,0 +1,88 @@
+"""Seat IDs of each showtime's theater, read from MovieService so bookings can be checked against them."""
+import base64
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+
+class ShowtimeNotFound(Exception):
+    """Raised when MovieService does not know the showtime."""
+
+
+class SeatsUnavailable(Exception):
+    """Raised when the showtime's seats cannot be fetched from MovieService."""
+
+
+class TheaterSeats:
+    """Seat IDs of one theater: first_seat_id + k for a stored layout, otherwise listed as seat_ids."""
+
+    def __init__(self, layout):
+        if 'first_seat_id' in layout:
+            size = len(layout['rows']) * layout['seats_per_row']
+            gaps = base64.b64decode(layout['gaps']) if layout['gaps'] else b''
+            self.first = layout['first_seat_id']
+            self.count = size - sum(bin(byte).count('1') for byte in gaps)
+            self.seat_ids = None
+        else:
+            self.seat_ids = frozenset(layout['seat_ids'])
+            self.first = min(self.seat_ids, default=0)
+            self.count = len(self.seat_ids)
+
+    def __contains__(self, seat_id):
+        if self.seat_ids is not None:
+            return seat_id in self.seat_ids
+        return self.first <= seat_id < self.first + self.count
+
+    def outside(self, seat_ids):
+        """The seat IDs that are not seats of this theater."""
+        return [seat_id for seat_id in seat_ids if seat_id not in self]
+
+
+class TheaterSeatsCache:
+    """TheaterSeats per showtime, fetched from MovieService and kept for ttl seconds.
+
+    A showtime's theater and its seats do not change once it is scheduled, so a
+    short TTL only bounds how long a deleted showtime stays bookable.
+    """
+
+    def __init__(self, base_url, timeout, max_showtimes, ttl):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_showtimes = max_showtimes
+        self.ttl = ttl
+        self._session = requests.Session()
+        self._session.trust_env = False
+        self._entries = OrderedDict()  # showtime_id -> (TheaterSeats, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, showtime_id):
+        """The showtime's TheaterSeats; raise ShowtimeNotFound or SeatsUnavailable."""
+        with self._lock:
+            entry = self._entries.get(showtime_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(showtime_id)
+                return entry[0]
+
+        try:
+            resp = self._session.get(
+                f'{self.base_url}/showtimes/{showtime_id}/seats', params={'format': 'bitmap'}, timeout=self.timeout
+            )
+            if resp.status_code == 404:
+                raise ShowtimeNotFound()
+            resp.raise_for_status()
+            seats = TheaterSeats(resp.json())
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            raise SeatsUnavailable(str(e))
+
+        with self._lock:
+            self._entries[showtime_id] = (seats, time.monotonic() + self.ttl)
+            self._entries.move_to_end(showtime_id)
+            while len(self._entries) > self.max_showtimes:
+                self._entries.popitem(last=False)
+        return seats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()